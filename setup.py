@@ -1,6 +1,6 @@
 """Setup configuration for firmware-investigate package."""
 
-from setuptools import setup, find_packages
+from setuptools import setup
 from pathlib import Path
 
 # Read the README file
@@ -16,7 +16,7 @@ setup(
     long_description_content_type="text/markdown",
     url="https://github.com/holdenk/firmware-investigate",
     package_dir={"": "src"},
-    packages=find_packages(where="src"),
+    packages=["firmware_investigate", "firmware_investigate.downloaders"],
     python_requires=">=3.8",
     install_requires=[
         # No Python dependencies - mitmproxy should be installed at system level
@@ -25,10 +25,14 @@ setup(
         "dev": [
             "pytest>=7.0",
             "pytest-cov>=4.0",
+            "pytest-xdist>=3.0",
             "black>=22.0",
             "flake8>=5.0",
             "mypy>=1.0",
         ],
+        "fast": [
+            "orjson>=3.0",
+        ],
     },
     entry_points={
         "console_scripts": [
@@ -2,6 +2,14 @@
 
 __version__ = "0.1.0"
 
-from .usb_gadget import USBGadgetFaker, SENA_DEVICE, CARDO_DEVICE
-
 __all__ = ["__version__", "USBGadgetFaker", "SENA_DEVICE", "CARDO_DEVICE"]
+
+
+def __getattr__(name):
+    # Resolve the USB gadget exports on first access so that importing a
+    # submodule (e.g. the CLI) does not pay for the usb_gadget import.
+    if name in ("USBGadgetFaker", "SENA_DEVICE", "CARDO_DEVICE"):
+        from . import usb_gadget
+
+        return getattr(usb_gadget, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,23 +1,73 @@
-"""Module for analyzing binary files using strings command."""
+"""Module for extracting strings from binary files."""
 
-import subprocess
+import concurrent.futures
+import hashlib
+import logging
+import mmap
+import os
+import re
+import shutil
+import stat
+import sys
+import tempfile
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# File extensions analyze_all treats as executables.
+EXECUTABLE_EXTENSIONS = frozenset({".exe", ".dll", ".pkg", ".dmg", ".app"})
+
+
+def _default_cache_dir() -> Path:
+    """Return the per-user strings cache directory.
+
+    Returns:
+        firmware_investigate/strings under $XDG_CACHE_HOME, or under ~/.cache
+        if that is not set.
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "firmware_investigate" / "strings"
+
+
+def _owned_by_user(st: os.stat_result) -> bool:
+    """Check that a stat result belongs to the current user.
+
+    Args:
+        st: Result of os.stat/os.lstat.
+
+    Returns:
+        True if the current user owns the file, or if the platform has no
+        POSIX user IDs.
+    """
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
 
 
 class StringsAnalyzer:
     """Analyzer for extracting strings from binary files."""
 
-    def __init__(self, min_length: int = 4):
+    __slots__ = ("min_length", "cache_dir")
+
+    def __init__(self, min_length: int = 4, cache_dir: Optional[Path] = None):
         """Initialize the strings analyzer.
 
         Args:
             min_length: Minimum length of strings to extract (default: 4).
+            cache_dir: Directory for cached strings output, keyed by file hash
+                (default: firmware_investigate/strings in the user's cache
+                directory, $XDG_CACHE_HOME or ~/.cache).
         """
         self.min_length = min_length
+        self.cache_dir = cache_dir or _default_cache_dir()
 
     def analyze(self, filepath: Path, output_file: Optional[Path] = None) -> List[str]:
-        """Run strings command on a binary file.
+        """Extract printable strings from a binary file.
+
+        This matches the output of ``strings -n <min_length>``: runs of
+        printable ASCII characters (including tab) at least ``min_length``
+        long. The file is memory-mapped and scanned in-process, and the
+        result is cached on disk by file content hash. Cache entries are
+        only trusted in a directory that no other user can write to.
 
         Args:
             filepath: Path to the binary file to analyze.
@@ -28,57 +78,195 @@ class StringsAnalyzer:
 
         Raises:
             FileNotFoundError: If the binary file doesn't exist.
-            RuntimeError: If strings command fails.
         """
         if not filepath.exists():
             raise FileNotFoundError(f"File not found: {filepath}")
 
+        cache_path: Optional[Path] = None
+        if self._prepare_cache_dir():
+            cache_path = self.cache_dir / f"{_hash_file(filepath)}_{self.min_length}.txt"
+            if _is_own_file(cache_path):
+                with open(cache_path) as f:
+                    strings_list = [line[:-1] for line in f]
+            else:
+                strings_list = self._write_cache(cache_path, self._iter_strings(filepath))
+        else:
+            strings_list = list(self._iter_strings(filepath))
+
+        if output_file:
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            if cache_path is not None:
+                shutil.copyfile(cache_path, output_file)
+            else:
+                with open(output_file, "w") as f:
+                    f.writelines(string + "\n" for string in strings_list)
+            logger.info("Strings output saved to: %s", output_file)
+
+        return strings_list
+
+    def _prepare_cache_dir(self) -> bool:
+        """Create the cache directory if needed and check that it is private.
+
+        Returns:
+            True if the directory is owned by the current user and not
+            writable by anyone else, False (with a warning) if the cache
+            cannot be used.
+        """
         try:
-            # Run strings command
-            result = subprocess.run(
-                ["strings", "-n", str(self.min_length), str(filepath)],
-                capture_output=True,
-                text=True,
-                check=True,
+            self.cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+            st = os.lstat(self.cache_dir)
+        except OSError as e:
+            logger.warning("Strings cache disabled, %s is unusable: %s", self.cache_dir, e)
+            return False
+        if not stat.S_ISDIR(st.st_mode) or not _owned_by_user(st) or st.st_mode & 0o022:
+            logger.warning(
+                "Strings cache disabled, %s is not a directory only this user can write",
+                self.cache_dir,
             )
+            return False
+        return True
 
-            strings_list = result.stdout.strip().split("\n")
+    def _iter_strings(self, filepath: Path) -> Iterator[str]:
+        """Scan a binary file for printable strings.
 
-            # Save to file if requested
-            if output_file:
-                output_file.parent.mkdir(parents=True, exist_ok=True)
-                with open(output_file, "w") as f:
-                    f.write(result.stdout)
-                print(f"Strings output saved to: {output_file}")
+        Args:
+            filepath: Path to the binary file to scan.
+
+        Yields:
+            Each string found in the binary, in file order.
+        """
+        pattern = re.compile(rb"[\t\x20-\x7e]{%d,}" % self.min_length)
+        with open(filepath, "rb") as f:
+            # mmap cannot map an empty file.
+            if os.fstat(f.fileno()).st_size == 0:
+                return
+            # The scan reads the mapping front to back; let the kernel read ahead.
+            if hasattr(os, "posix_fadvise"):
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+                for match in pattern.finditer(mm):
+                    yield match.group().decode("ascii")
+
+    def _write_cache(self, cache_path: Path, strings: Iterable[str]) -> List[str]:
+        """Atomically write extracted strings to the cache.
 
-            return strings_list
+        The strings are written as they are produced, in the same pass that
+        collects them.
 
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"strings command failed: {e.stderr}")
-        except FileNotFoundError:
-            raise RuntimeError("strings command not found. Please install binutils package.")
+        Args:
+            cache_path: Destination cache file.
+            strings: Strings to store, one per line.
+
+        Returns:
+            List of the strings written.
+        """
+        strings_list = []
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                for string in strings:
+                    f.write(string + "\n")
+                    strings_list.append(string)
+            os.replace(tmp_name, cache_path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return strings_list
 
     def analyze_all(self, directory: Path) -> dict:
         """Analyze all executable files in a directory.
 
+        Regular files whose extension is in EXECUTABLE_EXTENSIONS are analyzed;
+        the extension is matched case-insensitively, so Windows-style names
+        such as SETUP.EXE are included. Directories are skipped even when
+        their names match (e.g. a macOS .app bundle), and subdirectories are
+        not searched.
+
         Args:
             directory: Directory containing binary files.
 
         Returns:
             Dictionary mapping filenames to their extracted strings.
         """
-        results = {}
+        results: Dict[str, List[str]] = {}
 
-        # Common executable extensions
-        executable_patterns = ["*.exe", "*.dll", "*.pkg", "*.dmg", "*.app"]
+        # Common executable extensions, matched in a single directory pass
+        with os.scandir(directory) as entries:
+            paths = [
+                Path(entry.path)
+                for entry in entries
+                if entry.is_file()
+                and os.path.splitext(entry.name)[1].lower() in EXECUTABLE_EXTENSIONS
+            ]
+        if not paths:
+            return results
 
-        for pattern in executable_patterns:
-            for filepath in directory.glob(pattern):
+        # Files are independent, so scan them in parallel worker processes.
+        with concurrent.futures.ProcessPoolExecutor() as executor:
+            futures = {
+                executor.submit(_analyze_file, self.min_length, self.cache_dir, filepath): filepath
+                for filepath in paths
+            }
+            for future, filepath in futures.items():
                 try:
-                    strings_list = self.analyze(filepath)
+                    strings_list = future.result()
                     results[filepath.name] = strings_list
-                    print(f"Analyzed {filepath.name}: {len(strings_list)} strings found")
+                    logger.info("Analyzed %s: %d strings found", filepath.name, len(strings_list))
                 except Exception as e:
-                    print(f"Error analyzing {filepath.name}: {e}")
+                    logger.error("Error analyzing %s: %s", filepath.name, e)
 
         return results
+
+
+def _hash_file(filepath: Path) -> str:
+    """Compute the cache key for a file's contents.
+
+    Args:
+        filepath: Path to the file to hash.
+
+    Returns:
+        SHA-256 hex digest of the file contents.
+    """
+    with open(filepath, "rb") as f:
+        if sys.version_info >= (3, 11):
+            return hashlib.file_digest(f, "sha256").hexdigest()
+        # Python < 3.11: hash the whole mapping in a single update() call.
+        digest = hashlib.sha256()
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+        return digest.hexdigest()
+
+
+def _is_own_file(path: Path) -> bool:
+    """Check that a cache entry is a regular file owned by the current user.
+
+    Symlinks are not followed, so a link planted in the cache is rejected.
+
+    Args:
+        path: Cache entry to check.
+
+    Returns:
+        True if the entry can be trusted, False if it is missing or not ours.
+    """
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError:
+        return False
+    return stat.S_ISREG(st.st_mode) and _owned_by_user(st)
+
+
+def _analyze_file(min_length: int, cache_dir: Path, filepath: Path) -> List[str]:
+    """Run StringsAnalyzer.analyze in a worker process.
+
+    Args:
+        min_length: Minimum length of strings to extract.
+        cache_dir: Directory for cached strings output.
+        filepath: Path to the binary file to analyze.
+
+    Returns:
+        List of strings extracted from the binary.
+    """
+    return StringsAnalyzer(min_length, cache_dir).analyze(filepath)
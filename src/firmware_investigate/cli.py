@@ -1,22 +1,64 @@
 """Command-line interface for firmware investigation tools."""
 
 import argparse
-import platform
+import concurrent.futures
+import functools
+import importlib
+import logging
 import sys
+from typing import List
 
-from .downloaders import CardoDownloader, SenaDownloader
-from .usb_gadget import USBGadgetFaker
+logger = logging.getLogger(__name__)
 
+# Loggers configured by setup_logging(): the package, and the module run with
+# "python -m", whose module-level logger is named "__main__".
+_LOGGER_NAMES = ("firmware_investigate", "__main__")
 
-def main():
-    """Main entry point for the CLI."""
+# Handlers installed by setup_logging(), replaced on each call.
+_log_handlers: List[logging.Handler] = []
+
+# Vendor key -> (display name, downloader module, downloader class). Modules are
+# imported only when their vendor is selected.
+_VENDOR_TABLE = {
+    "sena": ("Sena", ".downloaders.sena", "SenaDownloader"),
+    "cardo": ("Cardo", ".downloaders.cardo", "CardoDownloader"),
+}
+
+
+def _load_vendors(selection):
+    """Import only the downloaders needed for the selected vendor.
+
+    Args:
+        selection: Vendor choice from the command line (a vendor key or 'all').
+
+    Returns:
+        List of (display name, downloader class) tuples.
+    """
+    keys = list(_VENDOR_TABLE) if selection == "all" else [selection]
+    vendors = []
+    for key in keys:
+        display_name, module_name, class_name = _VENDOR_TABLE[key]
+        module = importlib.import_module(module_name, __package__)
+        vendors.append((display_name, getattr(module, class_name)))
+    return vendors
+
+
+@functools.lru_cache(maxsize=1)
+def _build_parser():
+    """Build the CLI argument parser.
+
+    The parser is cached so repeated in-process calls to main() reuse it.
+
+    Returns:
+        The configured ArgumentParser.
+    """
     parser = argparse.ArgumentParser(
         description="Firmware Investigation Toolkit - Download and analyze firmware"
     )
 
     parser.add_argument(
         "--vendor",
-        choices=["sena", "cardo", "all"],
+        choices=(*_VENDOR_TABLE, "all"),
         default="all",
         help="Which vendor's firmware to download (default: all)",
     )
@@ -35,7 +77,7 @@ def main():
 
     parser.add_argument(
         "--platform",
-        choices=["windows", "darwin", "auto"],
+        choices=("windows", "darwin", "auto"),
         default="auto",
         help="Platform to download for (default: auto-detect)",
     )
@@ -52,66 +94,144 @@ def main():
         help="Check if Sena and Cardo USB devices are present",
     )
 
-    args = parser.parse_args()
+    parser.add_argument(
+        "--log-level",
+        choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+        default="INFO",
+        help="Logging verbosity (default: INFO)",
+    )
+
+    return parser
+
+
+def setup_logging(level):
+    """Send log records to stdout, and warnings and errors to stderr.
+
+    Only the firmware_investigate package logger (and the "__main__" logger
+    of a module run with -m) is configured, and handlers from a previous call
+    are replaced, so entry points can run repeatedly in one process with
+    different levels.
+
+    Args:
+        level: Name of the minimum level to emit.
+    """
+    formatter = logging.Formatter("%(message)s")
+    stdout_handler = logging.StreamHandler(sys.stdout)
+    stdout_handler.addFilter(lambda record: record.levelno < logging.WARNING)
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setLevel(logging.WARNING)
+    for handler in (stdout_handler, stderr_handler):
+        handler.setFormatter(formatter)
+
+    for name in _LOGGER_NAMES:
+        target = logging.getLogger(name)
+        for handler in _log_handlers:
+            target.removeHandler(handler)
+        target.addHandler(stdout_handler)
+        target.addHandler(stderr_handler)
+        target.setLevel(level)
+        # The records are printed here; don't repeat them through any root handlers.
+        target.propagate = False
+    _log_handlers[:] = [stdout_handler, stderr_handler]
+
+
+def main(argv=None, configure_logging=None):
+    """Main entry point for the CLI.
+
+    Args:
+        argv: Command-line arguments (default: sys.argv[1:]).
+        configure_logging: Whether to install the CLI's log handlers and apply
+            --log-level. Defaults to True only when argv is None, i.e. when run
+            as the console script; callers passing argv keep their own logging
+            configuration unless they ask for it.
+
+    Returns:
+        Exit code (0 for success, non-zero for failure).
+    """
+    args = _build_parser().parse_args(argv)
+    if configure_logging is None:
+        configure_logging = argv is None
+    if configure_logging:
+        setup_logging(args.log_level)
 
     # Handle USB gadget options
     if args.check_usb_devices:
+        from .usb_gadget import USBGadgetFaker
+
         faker = USBGadgetFaker()
-        print("Checking for USB devices...")
+        logger.info("Checking for USB devices...")
         sena_present = faker.check_device_present("0x0003", "0x092b")
         cardo_present = faker.check_device_present("0x2685", "0x0900")
-        print(f"Sena (0x0003:0x092b): {'PRESENT' if sena_present else 'NOT FOUND'}")
-        print(f"Cardo (0x2685:0x0900): {'PRESENT' if cardo_present else 'NOT FOUND'}")
+        logger.info("Sena (0x0003:0x092b): %s", "PRESENT" if sena_present else "NOT FOUND")
+        logger.info("Cardo (0x2685:0x0900): %s", "PRESENT" if cardo_present else "NOT FOUND")
         return 0
 
     if args.setup_usb_gadgets:
+        from .usb_gadget import USBGadgetFaker
+
         faker = USBGadgetFaker()
-        print("Setting up USB gadgets...")
+        logger.info("Setting up USB gadgets...")
         results = faker.setup_fake_devices(check_existing=True)
         all_success = all(results.values())
         if all_success:
-            print("\nYou can verify with: lsusb | grep -E '0003:092b|2685:0900'")
+            logger.info("\nYou can verify with: lsusb | grep -E '0003:092b|2685:0900'")
             return 0
         else:
             return 1
 
     # Determine platform
     if args.platform == "auto":
+        import platform
+
         detected_platform = platform.system().lower()
-        print(f"Auto-detected platform: {detected_platform}")
+        logger.info("Auto-detected platform: %s", detected_platform)
         platform_override = None
     else:
         platform_override = args.platform
-        print(f"Using specified platform: {platform_override}")
+        logger.info("Using specified platform: %s", platform_override)
 
-    vendors = []
-    if args.vendor in ["sena", "all"]:
-        vendors.append(("Sena", SenaDownloader))
-    if args.vendor in ["cardo", "all"]:
-        vendors.append(("Cardo", CardoDownloader))
-
-    print("Firmware Investigation Toolkit")
-    print(f"Working directory: {args.working_dir}")
-    print("-" * 60)
-
-    for vendor_name, downloader_class in vendors:
-        print(f"\n{vendor_name}:")
-        downloader = downloader_class(
-            working_dir=args.working_dir, platform_override=platform_override
-        )
+    vendors = _load_vendors(args.vendor)
 
-        try:
-            result = downloader.download(force=args.force)
-            if result:
-                print(f"✓ Successfully downloaded to: {result}")
-            else:
-                print("✓ File already exists (use --force to re-download)")
-        except Exception as e:
-            print(f"✗ Error: {e}", file=sys.stderr)
-            return 1
+    logger.info("Firmware Investigation Toolkit")
+    logger.info("Working directory: %s", args.working_dir)
+    logger.info("-" * 60)
 
-    print("\n" + "-" * 60)
-    print("Download complete!")
+    downloaders = [
+        (
+            vendor_name,
+            downloader_class(working_dir=args.working_dir, platform_override=platform_override),
+        )
+        for vendor_name, downloader_class in vendors
+    ]
+
+    # Vendors are served from different hosts, so download them concurrently.
+    # Results are reported from this thread as each download finishes.
+    failed = False
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(downloaders)) as executor:
+        futures = {
+            executor.submit(downloader.download, force=args.force): vendor_name
+            for vendor_name, downloader in downloaders
+        }
+        for future in concurrent.futures.as_completed(futures):
+            vendor_name = futures[future]
+            logger.info("\n%s:", vendor_name)
+            try:
+                result = future.result()
+                if result:
+                    logger.info("✓ Successfully downloaded to: %s", result)
+                elif args.force:
+                    logger.info("✓ Unchanged on the server (304 Not Modified), not re-downloaded")
+                else:
+                    logger.info("✓ File already exists (use --force to re-download)")
+            except Exception as e:
+                logger.error("✗ Error: %s", e)
+                failed = True
+
+    if failed:
+        return 1
+
+    logger.info("\n" + "-" * 60)
+    logger.info("Download complete!")
     return 0
 
 
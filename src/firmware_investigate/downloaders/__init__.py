@@ -1,6 +1,19 @@
 """Firmware downloaders for various vendors."""
 
-from .sena import SenaDownloader
-from .cardo import CardoDownloader
-
 __all__ = ["SenaDownloader", "CardoDownloader"]
+
+# Export name -> submodule, imported on first access so that loading one vendor's
+# downloader does not import the others.
+_EXPORTS = {
+    "SenaDownloader": ".sena",
+    "CardoDownloader": ".cardo",
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        import importlib
+
+        module = importlib.import_module(_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
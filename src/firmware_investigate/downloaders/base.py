@@ -1,10 +1,17 @@
 """Base downloader class for firmware downloads."""
 
-import platform
+import json
+import logging
+import shutil
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+# Read size used when streaming downloads to disk.
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
 
 class BaseDownloader(ABC):
     """Base class for firmware downloaders."""
@@ -17,26 +24,30 @@ class BaseDownloader(ABC):
             platform_override: Override platform detection (windows, darwin, linux).
         """
         self.working_dir = Path(working_dir)
-        self.working_dir.mkdir(parents=True, exist_ok=True)
-        self.platform = platform_override or platform.system().lower()
+        if not self.working_dir.exists():
+            self.working_dir.mkdir(parents=True, exist_ok=True)
+        self.platform = platform_override or self._detect_platform()
 
-    @abstractmethod
-    def get_url(self) -> str:
-        """Get the download URL for the firmware.
+    @staticmethod
+    def _detect_platform() -> str:
+        """Detect the platform of the running system.
 
         Returns:
-            The URL to download the firmware from.
+            The lowercased platform name (e.g. windows, darwin, linux).
         """
-        pass
+        import platform
 
+        return platform.system().lower()
+
+    @property
     @abstractmethod
-    def get_filename(self) -> str:
-        """Get the filename to save the downloaded firmware as.
+    def url(self) -> str:
+        """The download URL for the firmware."""
 
-        Returns:
-            The filename for the downloaded file.
-        """
-        pass
+    @property
+    @abstractmethod
+    def filename(self) -> str:
+        """The filename to save the downloaded firmware as."""
 
     def get_filepath(self) -> Path:
         """Get the full path where the file will be saved.
@@ -44,7 +55,7 @@ class BaseDownloader(ABC):
         Returns:
             Path object pointing to the download location.
         """
-        return self.working_dir / self.get_filename()
+        return self.working_dir / self.filename
 
     def file_exists(self) -> bool:
         """Check if the firmware file already exists.
@@ -54,29 +65,138 @@ class BaseDownloader(ABC):
         """
         return self.get_filepath().exists()
 
+    def get_metadata_path(self) -> Path:
+        """Get the path of the sidecar file holding HTTP cache validators.
+
+        Returns:
+            Path object pointing to the metadata file next to the download.
+        """
+        filepath = self.get_filepath()
+        return filepath.with_name(filepath.name + ".meta.json")
+
+    def _load_metadata(self) -> dict:
+        """Load the cached ETag/Last-Modified metadata for the download.
+
+        Returns:
+            The stored metadata, or an empty dict if none is available.
+        """
+        try:
+            with open(self.get_metadata_path()) as f:
+                metadata: dict = json.load(f)
+                return metadata
+        except (OSError, ValueError):
+            return {}
+
+    def _save_metadata(self, metadata: dict) -> None:
+        """Persist the ETag/Last-Modified metadata for the download.
+
+        Args:
+            metadata: Metadata to store alongside the downloaded file.
+        """
+        with open(self.get_metadata_path(), "w") as f:
+            json.dump(metadata, f)
+
     def download(self, force: bool = False) -> Optional[Path]:
         """Download the firmware if not already present.
 
+        A previously interrupted download is resumed with an HTTP range
+        request, provided an ETag or Last-Modified validator was stored for it
+        (otherwise a changed file could not be detected, so it starts over).
+        When forcing a re-download of a complete file, the stored validators
+        are sent so an unchanged file is not transferred again.
+
         Args:
-            force: If True, download even if file already exists.
+            force: If True, download even if file already exists. An
+                incomplete file is downloaded again from the start rather
+                than resumed.
 
         Returns:
-            Path to the downloaded file, or None if download was skipped.
+            Path to the downloaded file, or None if download was skipped. With
+            force=True, None means the server reported the file unchanged.
         """
         filepath = self.get_filepath()
-
-        if self.file_exists() and not force:
-            print(f"File already exists: {filepath}")
+        # A single stat answers both "is it there" and "how much do we have".
+        # An empty file is treated the same as a missing one.
+        try:
+            size = filepath.stat().st_size
+        except FileNotFoundError:
+            size = 0
+        metadata = self._load_metadata() if size else {}
+        # Files downloaded before metadata was tracked are treated as complete.
+        complete = metadata.get("complete", True)
+
+        if size and complete and not force:
+            logger.info("File already exists: %s (%d bytes)", filepath, size)
             return None
 
-        print(f"Downloading {self.get_filename()} from {self.get_url()}...")
+        url = self.url
+        headers = {}
+        resume_from = 0
+        if size:
+            if complete:
+                if metadata.get("etag"):
+                    headers["If-None-Match"] = metadata["etag"]
+                if metadata.get("last_modified"):
+                    headers["If-Modified-Since"] = metadata["last_modified"]
+            elif not force:
+                # Without If-Range the server would append its current file to our
+                # old bytes even if it changed, so only resume when we can validate.
+                validator = metadata.get("etag") or metadata.get("last_modified")
+                if validator:
+                    resume_from = size
+                    headers["Range"] = f"bytes={resume_from}-"
+                    headers["If-Range"] = validator
+                else:
+                    logger.info("No validator stored for %s; restarting download", self.filename)
+
+        if resume_from:
+            logger.info("Resuming %s from byte %d (%s)...", self.filename, resume_from, url)
+        else:
+            logger.info("Downloading %s from %s...", self.filename, url)
 
         try:
+            import urllib.error
             import urllib.request
 
-            urllib.request.urlretrieve(self.get_url(), filepath)
-            print(f"Downloaded to: {filepath}")
+            request = urllib.request.Request(url, headers=headers)
+            try:
+                response = urllib.request.urlopen(request)
+            except urllib.error.HTTPError as e:
+                if e.code == 304:
+                    logger.info("File is up to date: %s", filepath)
+                    return None
+                if e.code == 416 and resume_from:
+                    # Nothing left to send from our offset. If the server's size
+                    # matches ours, the download finished before its metadata was
+                    # updated; otherwise the partial file is unusable.
+                    if e.headers.get("Content-Range", "") == f"bytes */{size}":
+                        metadata["complete"] = True
+                        self._save_metadata(metadata)
+                        logger.info("File already complete: %s (%d bytes)", filepath, size)
+                        return None
+                    logger.info("Cannot resume %s; restarting download", self.filename)
+                    filepath.unlink()
+                    return self.download(force=force)
+                raise
+
+            with response:
+                # A 200 means the server ignored the range (or the file changed).
+                mode = "ab" if response.status == 206 else "wb"
+                self._save_metadata(
+                    {
+                        "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified"),
+                        "complete": False,
+                    }
+                )
+                with open(filepath, mode) as f:
+                    shutil.copyfileobj(response, f, length=DOWNLOAD_CHUNK_SIZE)
+
+            metadata = self._load_metadata()
+            metadata["complete"] = True
+            self._save_metadata(metadata)
+            logger.info("Downloaded to: %s", filepath)
             return filepath
         except Exception as e:
-            print(f"Error downloading file: {e}")
+            logger.error("Error downloading file: %s", e)
             raise
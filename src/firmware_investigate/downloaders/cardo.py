@@ -1,5 +1,6 @@
 """Cardo firmware downloader."""
 
+import functools
 from typing import Optional
 
 from .base import BaseDownloader
@@ -16,6 +17,12 @@ class CardoDownloader(BaseDownloader):
     # Upstream source to check if download fails
     CARDO_UPSTREAM_URL = "https://cardo.htskys.com/en/support/upadate-firmware/"
 
+    _URLS = {"windows": CARDO_WINDOWS_URL, "darwin": CARDO_MACOS_URL}
+    _FILENAMES = {
+        "windows": "cardo_updater_win_latest.exe",
+        "darwin": "CardoUpdateLite_OTA_darwin_arm64_latest.dmg",
+    }
+
     def __init__(self, working_dir: str = "working", platform_override: Optional[str] = None):
         """Initialize Cardo downloader.
 
@@ -25,30 +32,13 @@ class CardoDownloader(BaseDownloader):
         """
         super().__init__(working_dir, platform_override)
 
-    def get_url(self) -> str:
-        """Get the download URL for Cardo firmware tools.
+    @functools.cached_property
+    def url(self) -> str:
+        """The download URL for Cardo firmware tools based on platform."""
+        # Default to Windows if platform not recognized
+        return self._URLS.get(self.platform, self._URLS["windows"])
 
-        Returns:
-            The URL to download from based on platform.
-        """
-        if self.platform == "windows":
-            return self.CARDO_WINDOWS_URL
-        elif self.platform == "darwin":
-            return self.CARDO_MACOS_URL
-        else:
-            # Default to Windows if platform not recognized
-            return self.CARDO_WINDOWS_URL
-
-    def get_filename(self) -> str:
-        """Get the filename for the Cardo download.
-
-        Returns:
-            The filename to save as based on platform.
-        """
-        if self.platform == "windows":
-            return "cardo_updater_win_latest.exe"
-        elif self.platform == "darwin":
-            return "CardoUpdateLite_OTA_darwin_arm64_latest.dmg"
-        else:
-            # Default to Windows if platform not recognized
-            return "cardo_updater_win_latest.exe"
+    @functools.cached_property
+    def filename(self) -> str:
+        """The filename to save the Cardo download as based on platform."""
+        return self._FILENAMES.get(self.platform, self._FILENAMES["windows"])
@@ -1,5 +1,6 @@
 """Sena firmware downloader."""
 
+import functools
 from typing import Optional
 
 from .base import BaseDownloader
@@ -19,6 +20,12 @@ class SenaDownloader(BaseDownloader):
     # Upstream source to check if download fails
     SENA_UPSTREAM_URL = "https://www.sena.com/en-us/support/device-manager/"
 
+    _URLS = {"windows": SENA_WINDOWS_URL, "darwin": SENA_MACOS_URL}
+    _FILENAMES = {
+        "windows": "SenaDeviceManagerForWindows-v4.4.16-setup_x64.exe",
+        "darwin": "SENADeviceManagerForMAC-v4.4.16.pkg",
+    }
+
     def __init__(self, working_dir: str = "working", platform_override: Optional[str] = None):
         """Initialize Sena downloader.
 
@@ -28,30 +35,13 @@ class SenaDownloader(BaseDownloader):
         """
         super().__init__(working_dir, platform_override)
 
-    def get_url(self) -> str:
-        """Get the download URL for Sena firmware tools.
+    @functools.cached_property
+    def url(self) -> str:
+        """The download URL for Sena firmware tools based on platform."""
+        # Default to Windows if platform not recognized
+        return self._URLS.get(self.platform, self._URLS["windows"])
 
-        Returns:
-            The URL to download from based on platform.
-        """
-        if self.platform == "windows":
-            return self.SENA_WINDOWS_URL
-        elif self.platform == "darwin":
-            return self.SENA_MACOS_URL
-        else:
-            # Default to Windows if platform not recognized
-            return self.SENA_WINDOWS_URL
-
-    def get_filename(self) -> str:
-        """Get the filename for the Sena download.
-
-        Returns:
-            The filename to save as based on platform.
-        """
-        if self.platform == "windows":
-            return "SenaDeviceManagerForWindows-v4.4.16-setup_x64.exe"
-        elif self.platform == "darwin":
-            return "SENADeviceManagerForMAC-v4.4.16.pkg"
-        else:
-            # Default to Windows if platform not recognized
-            return "SenaDeviceManagerForWindows-v4.4.16-setup_x64.exe"
+    @functools.cached_property
+    def filename(self) -> str:
+        """The filename to save the Sena download as based on platform."""
+        return self._FILENAMES.get(self.platform, self._FILENAMES["windows"])
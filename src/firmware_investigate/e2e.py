@@ -10,28 +10,95 @@ This script orchestrates the complete workflow:
 """
 
 import argparse
+import logging
+import os
 import sys
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Tuple, Type
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type, Union
 
 from firmware_investigate.analyzer import StringsAnalyzer
+from firmware_investigate.cli import setup_logging
 from firmware_investigate.downloaders import CardoDownloader, SenaDownloader
 from firmware_investigate.downloaders.base import BaseDownloader
 from firmware_investigate.mitmproxy_manager import MitmproxyManager
 from firmware_investigate.wine_runner import WineRunner
 
+logger = logging.getLogger(__name__)
+
+_RULE = "=" * 80
+
+
+class UsbDevice(NamedTuple):
+    """A USB device to pass through to Wine, with its printable form."""
+
+    vendor_id: str
+    product_id: str
+    display: str
+
+
+def _usb_device(vendor_id: str, product_id: str) -> UsbDevice:
+    """Build a UsbDevice, formatting its display string once.
+
+    Args:
+        vendor_id: USB vendor ID (e.g., "0x0003").
+        product_id: USB product ID (e.g., "0x092B").
+
+    Returns:
+        The device description.
+    """
+    return UsbDevice(vendor_id, product_id, f"Vendor: {vendor_id}, Product: {product_id}")
+
 
 # USB device configurations
 SENA_USB_DEVICES = [
-    {"vendor_id": "0x0003", "product_id": "0x092B"},
+    _usb_device("0x0003", "0x092B"),
 ]
 
 CARDO_USB_DEVICES = [
-    {"vendor_id": "0x2685", "product_id": "0x0900"},
+    _usb_device("0x2685", "0x0900"),
 ]
 
 
+def _log_banner(title: str) -> None:
+    """Log a step heading framed by horizontal rules.
+
+    Args:
+        title: Heading text.
+    """
+    logger.info("\n%s\n%s\n%s", _RULE, title, _RULE)
+
+
+def _download_one(downloader: BaseDownloader) -> Union[Optional[Path], Exception]:
+    """Download one vendor's updater, capturing any error.
+
+    Args:
+        downloader: Downloader for the vendor.
+
+    Returns:
+        Either the download result or the raised exception.
+    """
+    try:
+        return downloader.download(force=False)
+    except Exception as e:
+        return e
+
+
+def _analyze_one(filepath: Path, output_file: Path, min_length: int) -> int:
+    """Run strings analysis on one binary in a worker process.
+
+    Args:
+        filepath: Binary to analyze.
+        output_file: Where to save the extracted strings.
+        min_length: Minimum length of strings to extract.
+
+    Returns:
+        Number of strings found.
+    """
+    return len(StringsAnalyzer(min_length=min_length).analyze(filepath, output_file=output_file))
+
+
 def run_e2e(
     vendor: str,
     working_dir: Path,
@@ -53,177 +120,181 @@ def run_e2e(
     Returns:
         Exit code (0 for success, non-zero for failure).
     """
-    print("=" * 80)
-    print("Firmware Investigation E2E Workflow")
-    print("=" * 80)
-    print(f"Vendor: {vendor}")
-    print(f"Working directory: {working_dir}")
-    print(f"Platform: {platform}")
-    print()
+    logger.info("%s\nFirmware Investigation E2E Workflow\n%s", _RULE, _RULE)
+    logger.info("Vendor: %s", vendor)
+    logger.info("Working directory: %s", working_dir)
+    logger.info("Platform: %s\n", platform)
 
     # Determine which vendors to process
-    vendors_to_process: List[Tuple[str, Type[BaseDownloader], List[dict[str, str]]]] = []
+    vendors_to_process: List[Tuple[str, Type[BaseDownloader], List[UsbDevice]]] = []
     if vendor in ["sena", "all"]:
         vendors_to_process.append(("Sena", SenaDownloader, SENA_USB_DEVICES))
     if vendor in ["cardo", "all"]:
         vendors_to_process.append(("Cardo", CardoDownloader, CARDO_USB_DEVICES))
+    if not vendors_to_process:
+        logger.error("Unknown vendor: %s (expected 'sena', 'cardo' or 'all')", vendor)
+        return 1
+
+    # Build each downloader once and reuse it (and its filepath) in every step.
+    downloaders: Dict[str, BaseDownloader] = {
+        name: downloader_class(working_dir=str(working_dir), platform_override=platform)
+        for name, downloader_class, _ in vendors_to_process
+    }
+    filepaths: Dict[str, Path] = {
+        name: downloader.get_filepath() for name, downloader in downloaders.items()
+    }
 
     # Step 1: Download firmware updaters
     if not skip_download:
-        print("\n" + "=" * 80)
-        print("STEP 1: Downloading Firmware Updaters")
-        print("=" * 80)
-
-        for vendor_name, downloader_class, _ in vendors_to_process:
-            print(f"\n{vendor_name}:")
-            downloader = downloader_class(
-                working_dir=str(working_dir),
-                platform_override=platform,
-            )
-
-            try:
-                result = downloader.download(force=False)
+        _log_banner("STEP 1: Downloading Firmware Updaters")
+
+        # Each vendor is a separate network transfer, so download them concurrently.
+        with ThreadPoolExecutor(max_workers=len(vendors_to_process)) as executor:
+            futures = {
+                executor.submit(_download_one, downloader): name
+                for name, downloader in downloaders.items()
+            }
+            for future in as_completed(futures):
+                vendor_name = futures[future]
+                result = future.result()
+                logger.info("\n%s:", vendor_name)
+                if isinstance(result, Exception):
+                    logger.error("✗ Error downloading: %s", result)
+                    return 1
                 if result:
-                    print(f"✓ Downloaded to: {result}")
+                    logger.info("✓ Downloaded to: %s", result)
                 else:
-                    print(f"✓ File already exists: {downloader.get_filepath()}")
-            except Exception as e:
-                print(f"✗ Error downloading: {e}")
-                return 1
+                    logger.info("✓ File already exists: %s", filepaths[vendor_name])
     else:
-        print("\n[SKIPPED] Download step (--skip-download)")
+        logger.info("\n[SKIPPED] Download step (--skip-download)")
 
     # Step 2: Run strings analysis
     if not skip_strings:
-        print("\n" + "=" * 80)
-        print("STEP 2: Strings Analysis")
-        print("=" * 80)
+        _log_banner("STEP 2: Strings Analysis")
 
-        analyzer = StringsAnalyzer(min_length=4)
         strings_output_dir = working_dir / "strings_analysis"
         strings_output_dir.mkdir(parents=True, exist_ok=True)
 
-        for vendor_name, downloader_class, _ in vendors_to_process:
-            downloader = downloader_class(
-                working_dir=str(working_dir),
-                platform_override=platform,
-            )
-            filepath = downloader.get_filepath()
-
+        tasks = []
+        for vendor_name, filepath in filepaths.items():
             if filepath.exists():
-                print(f"\nAnalyzing {vendor_name}: {filepath.name}")
                 output_file = strings_output_dir / f"{filepath.stem}_strings.txt"
-
-                try:
-                    strings_list = analyzer.analyze(filepath, output_file=output_file)
-                    print(f"✓ Found {len(strings_list)} strings")
-                    print(f"✓ Saved to: {output_file}")
-                except Exception as e:
-                    print(f"✗ Error analyzing: {e}")
+                tasks.append((vendor_name, filepath, output_file))
             else:
-                print(f"\n⚠ Skipping {vendor_name}: file not found at {filepath}")
+                logger.warning("\n⚠ Skipping %s: file not found at %s", vendor_name, filepath)
+
+        if tasks:
+            # Scanning is CPU-bound, so analyze each vendor's binary in its own process.
+            with ProcessPoolExecutor(max_workers=min(len(tasks), os.cpu_count() or 1)) as pool:
+                analysis_futures = {
+                    pool.submit(_analyze_one, filepath, output_file, 4): (
+                        vendor_name,
+                        filepath,
+                        output_file,
+                    )
+                    for vendor_name, filepath, output_file in tasks
+                }
+                for analysis in as_completed(analysis_futures):
+                    vendor_name, filepath, output_file = analysis_futures[analysis]
+                    logger.info("\nAnalyzing %s: %s", vendor_name, filepath.name)
+                    try:
+                        logger.info("✓ Found %d strings", analysis.result())
+                        logger.info("✓ Saved to: %s", output_file)
+                    except Exception as e:
+                        logger.error("✗ Error analyzing: %s", e)
     else:
-        print("\n[SKIPPED] Strings analysis (--skip-strings)")
+        logger.info("\n[SKIPPED] Strings analysis (--skip-strings)")
 
     # Step 3: Start mitmproxy
-    print("\n" + "=" * 80)
-    print("STEP 3: Starting mitmproxy")
-    print("=" * 80)
+    _log_banner("STEP 3: Starting mitmproxy")
 
     mitmproxy_dir = working_dir / "mitmproxy"
     mitm_manager = MitmproxyManager(port=8080, output_dir=mitmproxy_dir)
 
     try:
         mitm_process = mitm_manager.start(background=True)
-        print("✓ mitmproxy started successfully")
-        print("  Listening on: 127.0.0.1:8080")
-        print(f"  Output directory: {mitmproxy_dir}")
+        logger.info("✓ mitmproxy started successfully")
+        logger.info("  Listening on: 127.0.0.1:8080")
+        logger.info("  Output directory: %s", mitmproxy_dir)
     except Exception as e:
-        print(f"✗ Failed to start mitmproxy: {e}")
-        print("  Note: mitmproxy must be installed separately")
-        print("  - macOS: brew install mitmproxy")
-        print("  - Linux/Windows: Download from https://mitmproxy.org/")
+        logger.error("✗ Failed to start mitmproxy: %s", e)
+        logger.error("  Note: mitmproxy must be installed separately")
+        logger.error("  - macOS: brew install mitmproxy")
+        logger.error("  - Linux/Windows: Download from https://mitmproxy.org/")
         raise e
 
     # Step 4: Run updaters in Wine
     if not skip_wine:
-        print("\n" + "=" * 80)
-        print("STEP 4: Running Updaters in Wine")
-        print("=" * 80)
+        _log_banner("STEP 4: Running Updaters in Wine")
 
         wine_runner = WineRunner(
             wine_prefix=working_dir / "wine_prefix",
+            log_dir=working_dir / "wine_logs",
             proxy_host="127.0.0.1",
             proxy_port=8080,
         )
 
         if not wine_runner.check_wine_installed():
-            print("✗ Wine is not installed")
-            print("  Install Wine to run Windows executables")
-            print("  On Ubuntu/Debian: sudo apt-get install wine")
-            print("  On macOS: brew install wine-stable")
+            logger.error("✗ Wine is not installed")
+            logger.error("  Install Wine to run Windows executables")
+            logger.error("  On Ubuntu/Debian: sudo apt-get install wine")
+            logger.error("  On macOS: brew install wine-stable")
         else:
-            for vendor_name, downloader_class, usb_devices in vendors_to_process:
-                downloader = downloader_class(
-                    working_dir=str(working_dir),
-                    platform_override=platform,
-                )
-                filepath = downloader.get_filepath()
-
-                if filepath.exists() and filepath.suffix == ".exe":
-                    print("\n{}: Running {}".format(vendor_name, filepath.name))
-                    print("USB devices to pass through:")
-                    for device in usb_devices:
-                        print(
-                            "  - Vendor: {}, Product: {}".format(
-                                device["vendor_id"], device["product_id"]
+            # Keep one wineserver up for all vendors instead of restarting it per run.
+            with wine_runner:
+                for vendor_name, _, usb_devices in vendors_to_process:
+                    filepath = filepaths[vendor_name]
+
+                    if filepath.exists() and filepath.suffix == ".exe":
+                        logger.info("\n%s: Running %s", vendor_name, filepath.name)
+                        logger.info("USB devices to pass through:")
+                        for device in usb_devices:
+                            logger.info("  - %s", device.display)
+
+                        try:
+                            wine_result = wine_runner.run(
+                                executable=filepath,
+                                usb_devices=[device._asdict() for device in usb_devices],
                             )
-                        )
-
-                    try:
-                        wine_result = wine_runner.run(
-                            executable=filepath,
-                            usb_devices=usb_devices,
-                        )
-                        print(f"✓ Execution completed (exit code: {wine_result.returncode})")
-                    except Exception as e:
-                        print(f"✗ Error running Wine: {e}")
-                else:
-                    if not filepath.exists():
-                        print("\n⚠ Skipping {}: file not found".format(vendor_name))
+                            logger.info(
+                                "✓ Execution completed (exit code: %d)", wine_result.returncode
+                            )
+                            logger.info("  stdout log: %s", wine_result.stdout_path)
+                            logger.info("  stderr log: %s", wine_result.stderr_path)
+                        except Exception as e:
+                            logger.error("✗ Error running Wine: %s", e)
                     else:
-                        print(
-                            "\n⚠ Skipping {}: {} files not supported in Wine".format(
-                                vendor_name, filepath.suffix
+                        if not filepath.exists():
+                            logger.warning("\n⚠ Skipping %s: file not found", vendor_name)
+                        else:
+                            logger.warning(
+                                "\n⚠ Skipping %s: %s files not supported in Wine",
+                                vendor_name,
+                                filepath.suffix,
                             )
-                        )
     else:
-        print("\n[SKIPPED] Wine execution (--skip-wine)")
+        logger.info("\n[SKIPPED] Wine execution (--skip-wine)")
 
     # Step 5: Stop mitmproxy and summarize
-    print("\n" + "=" * 80)
-    print("STEP 5: Cleanup and Summary")
-    print("=" * 80)
+    _log_banner("STEP 5: Cleanup and Summary")
 
     if mitm_process:
-        print("\nStopping mitmproxy...")
+        logger.info("\nStopping mitmproxy...")
         time.sleep(2)  # Give some time for final requests
         mitm_manager.stop()
-        print("✓ mitmproxy stopped")
-
-        print("\nCaptured traffic saved to:")
-        print(f"  - Flow file: {mitmproxy_dir / 'traffic.mitm'}")
-        print(f"  - Request log: {mitmproxy_dir / 'requests.jsonl'}")
-        print(f"  - Response log: {mitmproxy_dir / 'responses.jsonl'}")
-
-    print("\n" + "=" * 80)
-    print("E2E Workflow Complete!")
-    print("=" * 80)
-    print(f"\nResults available in: {working_dir}")
-    print("\nNext steps:")
-    print("  1. Review strings analysis in: strings_analysis/")
-    print("  2. Analyze captured traffic in: mitmproxy/")
-    print("  3. Examine any downloaded firmware binaries")
+        logger.info("✓ mitmproxy stopped")
+
+        logger.info("\nCaptured traffic saved to:")
+        logger.info("  - Flow file: %s", mitmproxy_dir / "traffic.mitm")
+        logger.info("  - Request log: %s", mitmproxy_dir / "requests.jsonl")
+        logger.info("  - Response log: %s", mitmproxy_dir / "responses.jsonl")
+
+    _log_banner("E2E Workflow Complete!")
+    logger.info("\nResults available in: %s", working_dir)
+    logger.info("\nNext steps:")
+    logger.info("  1. Review strings analysis in: strings_analysis/")
+    logger.info("  2. Analyze captured traffic in: mitmproxy/")
+    logger.info("  3. Examine any downloaded firmware binaries")
 
     return 0
 
@@ -285,7 +356,32 @@ Examples:
         help="Skip Wine execution step",
     )
 
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "--log-level",
+        choices=("DEBUG", "INFO", "WARNING", "ERROR"),
+        default="INFO",
+        help="Logging verbosity (default: INFO)",
+    )
+    verbosity.add_argument(
+        "-q",
+        "--quiet",
+        action="store_const",
+        dest="log_level",
+        const="WARNING",
+        help="Only report warnings and errors (same as --log-level WARNING)",
+    )
+    verbosity.add_argument(
+        "-v",
+        "--verbose",
+        action="store_const",
+        dest="log_level",
+        const="DEBUG",
+        help="Also report debug details (same as --log-level DEBUG)",
+    )
+
     args = parser.parse_args()
+    setup_logging(args.log_level)
 
     return run_e2e(
         vendor=args.vendor,
@@ -1,10 +1,74 @@
 """Mitmproxy addon for firmware update traffic analysis."""
 
+import asyncio
 import json
+import logging
 from pathlib import Path
-from mitmproxy import http
+from typing import TYPE_CHECKING, BinaryIO
+from urllib.parse import urlsplit
 import os
 
+# mitmdump loads this file itself; mitmproxy is only needed here for the type
+# hints, so the helpers stay importable (and testable) without it.
+if TYPE_CHECKING:
+    from mitmproxy import http
+
+logger = logging.getLogger(__name__)
+
+FIRMWARE_WRITE_CHUNK_SIZE = 1 << 20
+LOG_BUFFER_SIZE = 1 << 18
+# Records to buffer before pushing the logs to disk, so they stay tail-able.
+LOG_FLUSH_EVERY = 64
+
+# URL suffixes that mark a response as a firmware image.
+_FW_EXT = (".bin", ".hex", ".fw", ".firmware")
+
+# orjson (the optional "fast" extra) encodes the per-flow log records several
+# times faster than json and returns newline-terminated bytes ready for the
+# binary log files in a single allocation.
+try:
+    import orjson
+
+    def _dumps(obj: dict) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+except ImportError:
+
+    def _dumps(obj: dict) -> bytes:
+        return (json.dumps(obj, separators=(",", ":")) + "\n").encode()
+
+
+def _header_pairs(headers: "http.Headers") -> list:
+    """Return headers as [name, value] pairs in wire order.
+
+    Unlike dict(headers) this keeps repeated headers such as Set-Cookie and
+    skips building an intermediate dict.
+
+    Args:
+        headers: Request or response headers.
+
+    Returns:
+        A list of (name, value) tuples, serialized as JSON arrays.
+    """
+    return list(headers.items(multi=True))
+
+
+def _write_firmware(path: Path, body: bytes) -> None:
+    """Write a captured firmware image in fixed-size slices.
+
+    The body is sliced through a memoryview, so no slice is copied, and the
+    file is unbuffered, so the data is not staged in a Python-side buffer.
+
+    Args:
+        path: Destination file.
+        body: Response body to save.
+    """
+    view = memoryview(body)
+    with open(path, "wb", buffering=0) as f:
+        while view:
+            # Raw writes may be partial; resume from however much was written.
+            view = view[f.write(view[:FIRMWARE_WRITE_CHUNK_SIZE]) :]
+
 
 class FirmwareAddon:
     """Addon to log and analyze firmware update traffic."""
@@ -12,8 +76,12 @@ class FirmwareAddon:
     def __init__(self):
         self.output_dir = Path(os.getenv("OUTDIR"))
         self.request_count = 0
+        # Keep the logs open for the life of the proxy rather than reopening them per flow.
+        self.req_fp = open(self.output_dir / "requests.jsonl", "ab", buffering=LOG_BUFFER_SIZE)
+        self.resp_fp = open(self.output_dir / "responses.jsonl", "ab", buffering=LOG_BUFFER_SIZE)
+        self._unflushed = 0
 
-    def request(self, flow: http.HTTPFlow) -> None:
+    async def request(self, flow: "http.HTTPFlow") -> None:
         """Log HTTP/HTTPS requests."""
         self.request_count += 1
 
@@ -21,55 +89,101 @@ class FirmwareAddon:
             "id": self.request_count,
             "method": flow.request.method,
             "url": flow.request.pretty_url,
-            "headers": dict(flow.request.headers),
+            "headers": _header_pairs(flow.request.headers),
             "timestamp": flow.request.timestamp_start,
         }
 
         # Log to file
-        log_file = self.output_dir / "requests.jsonl"
-        with open(log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\\n")
+        self._write_record(self.req_fp, log_entry)
 
-        print(f"[{self.request_count}] {flow.request.method} {flow.request.pretty_url}")
+        logger.info("[%d] %s %s", self.request_count, flow.request.method, flow.request.pretty_url)
 
-    def response(self, flow: http.HTTPFlow) -> None:
+    async def response(self, flow: "http.HTTPFlow") -> None:
         """Log HTTP/HTTPS responses."""
+        # Other flows may advance the counter while this one awaits the firmware write.
+        request_id = self.request_count
         log_entry = {
-            "id": self.request_count,
+            "id": request_id,
         }
         response = flow.response
         if response:
             log_entry = {
-                "id": self.request_count,
+                "id": request_id,
                 "status_code": response.status_code,
-                "headers": dict(response.headers),
-                "content_length": len(response.content) if response.content else 0,
+                "headers": _header_pairs(response.headers),
+                "content_length": self._content_length(response),
                 "timestamp": response.timestamp_end,
             }
-            print(
-                f"[{self.request_count}] Response: {response.status_code} "
-                f"({log_entry['content_length']} bytes)"
+            logger.info(
+                "[%d] Response: %d (%s bytes)",
+                request_id,
+                response.status_code,
+                log_entry["content_length"],
             )
         else:
-            print(f"[{self.request_count}] **NO RESPONSE** ")
+            logger.info("[%d] **NO RESPONSE**", request_id)
 
-        # Log to file
-        log_file = self.output_dir / "responses.jsonl"
-        with open(log_file, "a") as f:
-            f.write(json.dumps(log_entry) + "\\n")
+        # Log to file. The write lands in the in-memory buffer, so it stays on the event loop.
+        self._write_record(self.resp_fp, log_entry)
 
         # Save firmware binaries if detected
-        if flow.response and flow.response.content:
-            content_type = flow.response.headers.get("content-type", "")
-            print(f"Flow content {content_type} for {flow.request.url}")
-            if (
-                any(ext in flow.request.url for ext in [".bin", ".hex", ".fw", ".firmware"])
-                or "bin" in content_type
-            ):
-                filename = self.output_dir / f"firmware_{self.request_count}.bin"
-                with open(filename, "wb") as f:
-                    f.write(flow.response.content)
-                print(f"[{self.request_count}] Saved firmware to {filename}")
+        if response and response.raw_content:
+            url = flow.request.url
+            content_type = response.headers.get("content-type", "")
+            logger.debug("Flow content %s for %s", content_type, url)
+            if urlsplit(url).path.lower().endswith(_FW_EXT) or "bin" in content_type:
+                # Decode the body once, only for responses that are actually saved.
+                body = response.get_content(strict=False)
+                filename = self.output_dir / f"firmware_{request_id}.bin"
+                # Firmware images can be large; write them off the proxy's event loop.
+                await asyncio.get_running_loop().run_in_executor(
+                    None, _write_firmware, filename, body
+                )
+                logger.info("[%d] Saved firmware to %s", request_id, filename)
+
+    def _write_record(self, fp: BinaryIO, log_entry: dict) -> None:
+        """Append one JSONL record, flushing both logs every LOG_FLUSH_EVERY records.
+
+        Args:
+            fp: Log file to append to.
+            log_entry: Record to serialize.
+        """
+        fp.write(_dumps(log_entry))
+        self._unflushed += 1
+        if self._unflushed >= LOG_FLUSH_EVERY:
+            self.req_fp.flush()
+            self.resp_fp.flush()
+            self._unflushed = 0
+
+    @staticmethod
+    def _content_length(response: "http.Response") -> int:
+        """Return the body size without decoding the body.
+
+        Args:
+            response: Response to measure.
+
+        Returns:
+            The Content-Length header value, or the length of the raw body if
+            the header is missing or invalid.
+        """
+        # int() alone would also accept "-1" and "1_000", which are not valid lengths.
+        header = response.headers.get("content-length", "").strip()
+        if header.isdigit():
+            return int(header)
+        return len(response.raw_content or b"")
+
+    def done(self) -> None:
+        """Flush, sync and close the log files when mitmproxy shuts down.
+
+        Records are only pushed to the OS while running; they are made
+        durable once here rather than on every write.
+        """
+        # macOS has no fdatasync.
+        sync = getattr(os, "fdatasync", os.fsync)
+        for fp in (self.req_fp, self.resp_fp):
+            fp.flush()
+            sync(fp.fileno())
+            fp.close()
 
 
 addons = [FirmwareAddon()]
@@ -1,11 +1,51 @@
 """Module for managing mitmproxy configuration and execution."""
 
+import logging
+import shutil
 import signal
+import socket
 import subprocess
+import time
 from pathlib import Path
-from typing import Optional
+from typing import BinaryIO, Optional
 import os
 
+logger = logging.getLogger(__name__)
+
+# How long to wait for mitmdump to start listening before handing it back anyway.
+STARTUP_TIMEOUT = 5.0
+STARTUP_POLL_INTERVAL = 0.05
+# How much of each log to include when reporting a failed start.
+LOG_TAIL_BYTES = 4096
+
+_ADDON_PATH = Path(__file__).resolve().parent / "firmware_addon.py"
+
+# Parent environment variables mitmdump needs: PATH to run, the home and
+# profile directories for its CA certificates in ~/.mitmproxy, locale and temp
+# dirs, PYTHONPATH for a non-default install, an optional TLS key log,
+# SYSTEMROOT for Python to start on Windows, and any upstream proxy settings.
+_ENV_PASSTHROUGH = (
+    "PATH",
+    "HOME",
+    "USERPROFILE",
+    "APPDATA",
+    "LANG",
+    "LC_ALL",
+    "LC_CTYPE",
+    "TMPDIR",
+    "TEMP",
+    "TMP",
+    "PYTHONPATH",
+    "SSLKEYLOGFILE",
+    "SYSTEMROOT",
+    "HTTP_PROXY",
+    "HTTPS_PROXY",
+    "NO_PROXY",
+    "http_proxy",
+    "https_proxy",
+    "no_proxy",
+)
+
 
 class MitmproxyManager:
     """Manager for mitmproxy execution and configuration."""
@@ -27,22 +67,26 @@ class MitmproxyManager:
         self.output_dir = output_dir or Path("working/mitmproxy")
         self.mode = mode
         self.process: Optional[subprocess.Popen] = None
+        self._stdout_log: Optional[BinaryIO] = None
+        self._stderr_log: Optional[BinaryIO] = None
+        self._mitm_installed: Optional[bool] = None
+        self._mitmdump_path: Optional[str] = None
 
-    def check_mitmproxy_installed(self) -> bool:
+    def check_mitmproxy_installed(self, refresh: bool = False) -> bool:
         """Check if mitmproxy is installed.
 
+        The result is cached on the manager after the first check.
+
+        Args:
+            refresh: Re-run the check instead of using the cached result.
+
         Returns:
             True if mitmproxy is available, False otherwise.
         """
-        try:
-            subprocess.run(
-                ["mitmdump", "--version"],
-                capture_output=True,
-                check=True,
-            )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        if self._mitm_installed is None or refresh:
+            self._mitmdump_path = shutil.which("mitmdump")
+            self._mitm_installed = self._mitmdump_path is not None
+        return self._mitm_installed
 
     def start(self, background: bool = True) -> Optional[subprocess.Popen]:
         """Start mitmproxy in the background.
@@ -54,15 +98,19 @@ class MitmproxyManager:
             Popen process object if background=True, None otherwise.
 
         Raises:
-            RuntimeError: If mitmproxy is not installed.
+            RuntimeError: If mitmproxy is not installed, the port is already in
+                use, or mitmproxy exits during startup.
         """
         if not self.check_mitmproxy_installed():
             raise RuntimeError("mitmproxy is not installed. Install with: pip install mitmproxy")
 
-        # Create addon script
-        current_file_path = os.path.abspath(__file__)
-        current_dir = os.path.dirname(current_file_path)
-        addon_script = current_dir + "/firmware_addon.py"
+        # Readiness is detected by connecting to the port, so another listener
+        # there would be mistaken for mitmdump (which would then fail to bind).
+        if self._port_in_use():
+            raise RuntimeError(
+                f"Port {self.port} is already in use; stop the other process or choose "
+                "another port"
+            )
 
         # Create output directory
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -70,11 +118,11 @@ class MitmproxyManager:
         # Build mitmdump command
         flow_file = self.output_dir / "traffic.mitm"
         cmd = [
-            "mitmdump",
+            self._mitmdump_path or "mitmdump",
             "-p",
             str(self.port),
             "-s",
-            str(addon_script),
+            str(_ADDON_PATH),
             "-w",
             str(flow_file),
             "--set",
@@ -82,54 +130,120 @@ class MitmproxyManager:
             "--ssl-insecure",  # Accept self-signed certificates
         ]
 
-        print(f"Starting mitmproxy on port {self.port}")
-        print(f"Traffic will be saved to: {flow_file}")
-        print(f"Logs will be saved to: {self.output_dir}")
-        mitm_env = os.environ.copy()
+        logger.info("Starting mitmproxy on port %d", self.port)
+        logger.info("Traffic will be saved to: %s", flow_file)
+        logger.info("Logs will be saved to: %s", self.output_dir)
+        mitm_env = {name: os.environ[name] for name in _ENV_PASSTHROUGH if name in os.environ}
         mitm_env["OUTDIR"] = str(self.output_dir)
 
         if background:
-            # Start in background
+            # Start in background. Output goes to files rather than pipes nobody
+            # drains, so a chatty mitmdump can never block on a full pipe.
+            stdout_path = self.output_dir / "mitmdump.stdout.log"
+            stderr_path = self.output_dir / "mitmdump.stderr.log"
+            self._stdout_log = open(stdout_path, "wb")
+            self._stderr_log = open(stderr_path, "wb")
             self.process = subprocess.Popen(
                 cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stdout=self._stdout_log,
+                stderr=self._stderr_log,
                 env=mitm_env,
+                # Python's own descriptors are non-inheritable, so there is nothing to
+                # close; this (with an absolute executable) lets CPython use posix_spawn.
+                close_fds=False,
             )
 
-            try:
-                # Give it a short moment to fail fast; if it returns, it exited
-                out, err = self.process.communicate(timeout=2)
-            except subprocess.TimeoutExpired:
-                # Still running after timeout -> started successfully in background
-                print(f"mitmproxy started in background (PID: {self.process.pid})")
+            if self._wait_until_listening(self.process):
+                logger.info("mitmproxy started in background (PID: %d)", self.process.pid)
                 return self.process
-            # Process exited before the 2 seconds.
+            # Process exited before it started listening.
+            self.process = None
+            self._close_logs()
             msg = "mitmproxy failed to start."
+            out = _read_tail(stdout_path)
             if out:
-                out_decoded = out.decode()
-                msg += f"\nstdout:\n{out_decoded}"
+                msg += f"\nstdout:\n{out}"
+            err = _read_tail(stderr_path)
             if err:
-                err_decoded = err.decode()
-                msg += f"\nstderr:\n{err_decoded}"
+                msg += f"\nstderr:\n{err}"
             raise RuntimeError(msg)
         else:
             # Run in foreground (blocking)
-            subprocess.run(cmd, env=mitm_env)
+            subprocess.run(cmd, env=mitm_env, close_fds=False)
             return None
 
+    def _port_in_use(self) -> bool:
+        """Check whether something is already listening on the proxy port.
+
+        Returns:
+            True if a connection to 127.0.0.1:port succeeds, False otherwise.
+        """
+        try:
+            with socket.create_connection(("127.0.0.1", self.port), timeout=STARTUP_POLL_INTERVAL):
+                return True
+        except OSError:
+            return False
+
+    def _wait_until_listening(self, process: subprocess.Popen) -> bool:
+        """Wait for the background mitmdump to accept connections.
+
+        Args:
+            process: The just-started mitmdump process.
+
+        Returns:
+            False if the process exited during startup, True otherwise. A
+            process that is still running when STARTUP_TIMEOUT expires is
+            treated as started.
+        """
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                return False
+            try:
+                with socket.create_connection(
+                    ("127.0.0.1", self.port), timeout=STARTUP_POLL_INTERVAL
+                ):
+                    return True
+            except OSError:
+                time.sleep(STARTUP_POLL_INTERVAL)
+        return process.poll() is None
+
     def stop(self) -> None:
         """Stop the running mitmproxy process."""
         if self.process:
-            print(f"Stopping mitmproxy (PID: {self.process.pid})...")
+            logger.info("Stopping mitmproxy (PID: %d)...", self.process.pid)
             self.process.send_signal(signal.SIGTERM)
 
             # Wait for graceful shutdown
             try:
                 self.process.wait(timeout=5)
             except subprocess.TimeoutExpired:
-                print("Force killing mitmproxy...")
+                logger.warning("Force killing mitmproxy...")
                 self.process.kill()
 
             self.process = None
-            print("mitmproxy stopped")
+            self._close_logs()
+            logger.info("mitmproxy stopped")
+
+    def _close_logs(self) -> None:
+        """Close the log files handed to the background process."""
+        for log in (self._stdout_log, self._stderr_log):
+            if log is not None:
+                log.close()
+        self._stdout_log = None
+        self._stderr_log = None
+
+
+def _read_tail(path: Path) -> str:
+    """Read the end of a log file.
+
+    Args:
+        path: Log file to read.
+
+    Returns:
+        Up to the last LOG_TAIL_BYTES of the file, decoded leniently.
+    """
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        f.seek(max(0, size - LOG_TAIL_BYTES))
+        return f.read().decode(errors="replace")
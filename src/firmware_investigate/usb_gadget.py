@@ -1,10 +1,19 @@
 """USB Gadget device faker for Sena and Cardo devices."""
 
+import logging
 import os
+import re
+import shutil
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_LSUSB_ID_RE = re.compile(r"\bid ([0-9a-f]{4}):([0-9a-f]{4})\b")
 
 
 class USBDeviceConfig:
@@ -52,29 +61,74 @@ CARDO_DEVICE = USBDeviceConfig(
 )
 
 
+def _write_attr(path: Path, value: str) -> None:
+    """Write a newline-terminated value to a configfs attribute in one write.
+
+    Args:
+        path: Attribute file.
+        value: Value to write.
+    """
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        os.write(fd, value.encode() + b"\n")
+    finally:
+        os.close(fd)
+
+
 class USBGadgetFaker:
     """Create fake USB devices using Linux USB gadget API."""
 
     CONFIGFS_PATH = Path("/sys/kernel/config/usb_gadget")
+    SYSFS_USB_PATH = Path("/sys/bus/usb/devices")
+    UDC_PATH = Path("/sys/class/udc")
 
     def __init__(self):
         """Initialize USB gadget faker."""
         self.gadgets_created: List[str] = []
+        # Gadgets are created and removed from worker threads.
+        self._gadgets_lock = threading.Lock()
+        self._usb_ids: Optional[FrozenSet[Tuple[str, str]]] = None
+        self._configfs_available: Optional[bool] = None
+        self._udc: Optional[str] = None
+        self._udc_probed = False
+        # setup_fake_devices checks devices from several threads; scan only once.
+        self._scan_lock = threading.Lock()
+        # Fallback used where sysfs is unavailable; None if lsusb is not installed.
+        self._lsusb_path: Optional[str] = shutil.which("lsusb")
+
+    def refresh_probes(self) -> None:
+        """Forget the cached configfs, UDC and lsusb probes.
+
+        Call this after mounting configfs, loading a UDC driver (e.g.
+        dummy_hcd) or installing lsusb so the next check sees the change.
+        """
+        self._configfs_available = None
+        self._udc = None
+        self._udc_probed = False
+        self._lsusb_path = shutil.which("lsusb")
 
     def is_configfs_available(self) -> bool:
         """Check if USB gadget configfs is available.
 
+        The result is cached until refresh_probes() is called.
+
         Returns:
             True if configfs is mounted and available, False otherwise.
         """
-        return self.CONFIGFS_PATH.exists() and self.CONFIGFS_PATH.is_dir()
+        if self._configfs_available is None:
+            self._configfs_available = os.path.isdir(self.CONFIGFS_PATH)
+        return self._configfs_available
 
-    def check_device_present(self, vendor_id: str, product_id: str) -> bool:
+    def check_device_present(self, vendor_id: str, product_id: str, refresh: bool = False) -> bool:
         """Check if a USB device with given vendor and product ID is present.
 
+        The attached devices are scanned once per faker and reused for later
+        checks.
+
         Args:
             vendor_id: Vendor ID in format "0x0003" or "0003"
             product_id: Product ID in format "0x092b" or "092b"
+            refresh: Rescan the attached devices instead of using the cached scan.
 
         Returns:
             True if device is present, False otherwise.
@@ -83,31 +137,68 @@ class USBGadgetFaker:
         vid = vendor_id.lower().replace("0x", "")
         pid = product_id.lower().replace("0x", "")
 
-        try:
-            result = subprocess.run(["lsusb"], capture_output=True, text=True, check=False)
-            output = result.stdout.lower()
+        with self._scan_lock:
+            if self._usb_ids is None or refresh:
+                self._usb_ids = self._scan_usb_ids()
+            return (vid, pid) in self._usb_ids
 
-            # lsusb format: "Bus 001 Device 002: ID 0003:092b ..."
-            device_id = f"{vid}:{pid}"
-            return device_id in output
+    def _scan_usb_ids(self) -> FrozenSet[Tuple[str, str]]:
+        """Collect the (vendor, product) IDs of attached USB devices.
 
-        except FileNotFoundError:
-            # lsusb not available, assume device not present
-            return False
+        Reads the IDs straight from sysfs, falling back to lsusb where sysfs
+        is not available.
+
+        Returns:
+            Lowercase hex ID pairs without a 0x prefix.
+        """
+        if os.path.isdir(self.SYSFS_USB_PATH):
+            ids = set()
+            with os.scandir(self.SYSFS_USB_PATH) as entries:
+                for entry in entries:
+                    # Interfaces (e.g. "1-1:1.0") have no device descriptor files.
+                    try:
+                        with open(os.path.join(entry.path, "idVendor")) as f:
+                            vid = f.read().strip().lower()
+                        with open(os.path.join(entry.path, "idProduct")) as f:
+                            pid = f.read().strip().lower()
+                    except OSError:
+                        continue
+                    ids.add((vid, pid))
+            return frozenset(ids)
+
+        if self._lsusb_path is None:
+            # lsusb not available, assume no devices present
+            return frozenset()
+        try:
+            result = subprocess.run([self._lsusb_path], capture_output=True, text=True, check=False)
+        except OSError:
+            # lsusb was removed or is not runnable
+            return frozenset()
+
+        # lsusb format: "Bus 001 Device 002: ID 0003:092b ..."
+        return frozenset((vid, pid) for vid, pid in _LSUSB_ID_RE.findall(result.stdout.lower()))
 
     def get_available_udc(self) -> Optional[str]:
         """Get the first available USB device controller.
 
+        The result is cached until refresh_probes() is called.
+
         Returns:
             Name of the UDC, or None if none available.
         """
-        udc_path = Path("/sys/class/udc")
-        if not udc_path.exists():
-            return None
+        if not self._udc_probed:
+            self._udc = self._scan_udc()
+            self._udc_probed = True
+        return self._udc
 
-        udcs = list(udc_path.iterdir())
-        if udcs:
-            return udcs[0].name
+    def _scan_udc(self) -> Optional[str]:
+        """Return the first entry of UDC_PATH, or None if there is none."""
+        try:
+            with os.scandir(self.UDC_PATH) as udcs:
+                for udc in udcs:
+                    return udc.name
+        except FileNotFoundError:
+            pass
         return None
 
     def create_gadget(self, device: USBDeviceConfig, gadget_name: str) -> bool:
@@ -120,85 +211,87 @@ class USBGadgetFaker:
         Returns:
             True if gadget was created successfully, False otherwise.
         """
-        if not self.is_configfs_available():
-            print(
-                "ERROR: USB gadget configfs not available at " f"{self.CONFIGFS_PATH}",
-                file=sys.stderr,
-            )
-            print(
-                "Ensure configfs is mounted and the system supports USB gadgets.",
-                file=sys.stderr,
-            )
-            return False
-
         gadget_path = self.CONFIGFS_PATH / gadget_name
 
-        # Check if gadget already exists
-        if gadget_path.exists():
-            print(f"Gadget {gadget_name} already exists at {gadget_path}")
+        # Check if gadget already exists. That implies configfs is available, so the
+        # common re-run case costs a single stat.
+        if os.path.exists(gadget_path):
+            logger.info("Gadget %s already exists at %s", gadget_name, gadget_path)
             return True
 
-        try:
-            # Create the gadget directory
-            gadget_path.mkdir(parents=True, exist_ok=True)
-
-            # Set USB device descriptor
-            (gadget_path / "idVendor").write_text(device.vendor_id + "\n")
-            (gadget_path / "idProduct").write_text(device.product_id + "\n")
-            (gadget_path / "bcdDevice").write_text("0x0100\n")  # Device release 1.0
-            (gadget_path / "bcdUSB").write_text("0x0200\n")  # USB 2.0
+        if not self.is_configfs_available():
+            logger.error("ERROR: USB gadget configfs not available at %s", self.CONFIGFS_PATH)
+            logger.error("Ensure configfs is mounted and the system supports USB gadgets.")
+            return False
 
-            # Create strings directory
+        try:
             strings_path = gadget_path / "strings" / "0x409"  # English (US)
-            strings_path.mkdir(parents=True, exist_ok=True)
-
-            (strings_path / "manufacturer").write_text(device.manufacturer + "\n")
-            (strings_path / "product").write_text(device.product + "\n")
-            (strings_path / "serialnumber").write_text(device.serial + "\n")
-
-            # Create configuration
             config_path = gadget_path / "configs" / "c.1"
-            config_path.mkdir(parents=True, exist_ok=True)
-
             config_strings_path = config_path / "strings" / "0x409"
-            config_strings_path.mkdir(parents=True, exist_ok=True)
-            (config_strings_path / "configuration").write_text(f"{device.product} Configuration\n")
 
-            # Set max power (in 2mA units, so 250 = 500mA)
-            (config_path / "MaxPower").write_text("250\n")
+            # Create the gadget with its strings and configuration directories
+            os.makedirs(strings_path, exist_ok=True)
+            os.makedirs(config_strings_path, exist_ok=True)
+
+            attributes = [
+                # USB device descriptor
+                (gadget_path / "idVendor", device.vendor_id),
+                (gadget_path / "idProduct", device.product_id),
+                (gadget_path / "bcdDevice", "0x0100"),  # Device release 1.0
+                (gadget_path / "bcdUSB", "0x0200"),  # USB 2.0
+                # Device strings
+                (strings_path / "manufacturer", device.manufacturer),
+                (strings_path / "product", device.product),
+                (strings_path / "serialnumber", device.serial),
+                # Configuration
+                (config_strings_path / "configuration", f"{device.product} Configuration"),
+                # Max power (in 2mA units, so 250 = 500mA)
+                (config_path / "MaxPower", "250"),
+            ]
+            for attr_path, value in attributes:
+                _write_attr(attr_path, value)
 
             # Get available UDC and bind gadget
             udc = self.get_available_udc()
             if udc:
-                (gadget_path / "UDC").write_text(udc + "\n")
-                print(f"Successfully created and bound gadget {gadget_name} to {udc}")
+                _write_attr(gadget_path / "UDC", udc)
+                logger.info("Successfully created and bound gadget %s to %s", gadget_name, udc)
             else:
-                print(
-                    f"WARNING: Created gadget {gadget_name} but no UDC available to bind",
-                    file=sys.stderr,
-                )
-                print(
-                    "You may need to load a UDC driver (e.g., dummy_hcd for testing)",
-                    file=sys.stderr,
+                logger.warning(
+                    "WARNING: Created gadget %s but no UDC available to bind", gadget_name
                 )
+                logger.warning("You may need to load a UDC driver (e.g., dummy_hcd for testing)")
 
-            self.gadgets_created.append(gadget_name)
+            with self._gadgets_lock:
+                self.gadgets_created.append(gadget_name)
             return True
 
         except PermissionError:
-            print(
-                f"ERROR: Permission denied creating gadget {gadget_name}",
-                file=sys.stderr,
-            )
-            print(
-                "This operation requires root privileges. Try running with sudo.",
-                file=sys.stderr,
-            )
+            logger.error("ERROR: Permission denied creating gadget %s", gadget_name)
+            logger.error("This operation requires root privileges. Try running with sudo.")
+            self._discard_partial_gadget(gadget_name)
             return False
         except Exception as e:
-            print(f"ERROR: Failed to create gadget {gadget_name}: {e}", file=sys.stderr)
+            logger.error("ERROR: Failed to create gadget %s: %s", gadget_name, e)
+            self._discard_partial_gadget(gadget_name)
             return False
 
+    def _discard_partial_gadget(self, gadget_name: str) -> None:
+        """Remove what a failed create_gadget() left behind.
+
+        The gadget is recorded in gadgets_created first, so if it cannot be
+        removed now cleanup() will try again.
+
+        Args:
+            gadget_name: Name of the gadget that failed to be created.
+        """
+        if not os.path.exists(self.CONFIGFS_PATH / gadget_name):
+            return
+        with self._gadgets_lock:
+            if gadget_name not in self.gadgets_created:
+                self.gadgets_created.append(gadget_name)
+        self.remove_gadget(gadget_name)
+
     def remove_gadget(self, gadget_name: str) -> bool:
         """Remove a USB gadget device.
 
@@ -210,47 +303,40 @@ class USBGadgetFaker:
         """
         gadget_path = self.CONFIGFS_PATH / gadget_name
 
-        if not gadget_path.exists():
-            print(f"Gadget {gadget_name} does not exist")
+        if not os.path.exists(gadget_path):
+            logger.info("Gadget %s does not exist", gadget_name)
             return True
 
         try:
             # Unbind from UDC
             udc_file = gadget_path / "UDC"
-            if udc_file.exists():
+            if os.path.exists(udc_file):
                 udc_file.write_text("\n")
 
-            # Remove configuration strings
-            config_strings = gadget_path / "configs" / "c.1" / "strings" / "0x409"
-            if config_strings.exists():
-                config_strings.rmdir()
-
-            # Remove configuration
+            # Remove configuration strings, configuration and strings, innermost first
             config_path = gadget_path / "configs" / "c.1"
-            if config_path.exists():
-                config_path.rmdir()
-
-            # Remove strings
-            strings_path = gadget_path / "strings" / "0x409"
-            if strings_path.exists():
-                strings_path.rmdir()
+            for directory in (
+                config_path / "strings" / "0x409",
+                config_path,
+                gadget_path / "strings" / "0x409",
+            ):
+                if os.path.exists(directory):
+                    os.rmdir(directory)
 
             # Remove gadget directory
             gadget_path.rmdir()
 
-            print(f"Successfully removed gadget {gadget_name}")
-            if gadget_name in self.gadgets_created:
-                self.gadgets_created.remove(gadget_name)
+            logger.info("Successfully removed gadget %s", gadget_name)
+            with self._gadgets_lock:
+                if gadget_name in self.gadgets_created:
+                    self.gadgets_created.remove(gadget_name)
             return True
 
         except PermissionError:
-            print(
-                f"ERROR: Permission denied removing gadget {gadget_name}",
-                file=sys.stderr,
-            )
+            logger.error("ERROR: Permission denied removing gadget %s", gadget_name)
             return False
         except Exception as e:
-            print(f"ERROR: Failed to remove gadget {gadget_name}: {e}", file=sys.stderr)
+            logger.error("ERROR: Failed to remove gadget %s: %s", gadget_name, e)
             return False
 
     def setup_fake_devices(self, check_existing: bool = True) -> Dict[str, bool]:
@@ -262,54 +348,44 @@ class USBGadgetFaker:
         Returns:
             Dictionary with device names as keys and success status as values.
         """
+        devices = [
+            ("sena", "Sena", SENA_DEVICE, "sena_fake"),
+            ("cardo", "Cardo", CARDO_DEVICE, "cardo_fake"),
+        ]
+
+        # Every gadget binds to the same UDC, so create them one at a time in a
+        # fixed order; which device gets the controller is then deterministic.
+        # The presence checks share one cached device scan and are cheap inline.
         results = {}
-
-        # Check and create Sena device
-        sena_present = (
-            self.check_device_present(SENA_DEVICE.vendor_id, SENA_DEVICE.product_id)
-            if check_existing
-            else False
-        )
-
-        if sena_present:
-            print(
-                f"Sena device ({SENA_DEVICE.vendor_id}:{SENA_DEVICE.product_id}) "
-                "already present, skipping."
-            )
-            results["sena"] = True
-        else:
-            print(
-                f"Sena device ({SENA_DEVICE.vendor_id}:{SENA_DEVICE.product_id}) "
-                "not found, creating fake device..."
-            )
-            results["sena"] = self.create_gadget(SENA_DEVICE, "sena_fake")
-
-        # Check and create Cardo device
-        cardo_present = (
-            self.check_device_present(CARDO_DEVICE.vendor_id, CARDO_DEVICE.product_id)
-            if check_existing
-            else False
-        )
-
-        if cardo_present:
-            print(
-                f"Cardo device ({CARDO_DEVICE.vendor_id}:{CARDO_DEVICE.product_id}) "
-                "already present, skipping."
-            )
-            results["cardo"] = True
-        else:
-            print(
-                f"Cardo device ({CARDO_DEVICE.vendor_id}:{CARDO_DEVICE.product_id}) "
-                "not found, creating fake device..."
+        for key, label, device, gadget_name in devices:
+            if check_existing and self.check_device_present(device.vendor_id, device.product_id):
+                logger.info(
+                    "%s device (%s:%s) already present, skipping.",
+                    label,
+                    device.vendor_id,
+                    device.product_id,
+                )
+                results[key] = True
+                continue
+
+            logger.info(
+                "%s device (%s:%s) not found, creating fake device...",
+                label,
+                device.vendor_id,
+                device.product_id,
             )
-            results["cardo"] = self.create_gadget(CARDO_DEVICE, "cardo_fake")
-
+            results[key] = self.create_gadget(device, gadget_name)
         return results
 
     def cleanup(self) -> None:
         """Clean up all gadgets created by this instance."""
-        for gadget_name in self.gadgets_created[:]:  # Copy list to iterate safely
-            self.remove_gadget(gadget_name)
+        with self._gadgets_lock:
+            gadget_names = self.gadgets_created[:]  # Copy list to iterate safely
+        if not gadget_names:
+            return
+        # Each gadget has its own configfs tree, so they can be torn down in parallel.
+        with ThreadPoolExecutor(max_workers=min(8, len(gadget_names))) as executor:
+            list(executor.map(self.remove_gadget, gadget_names))
 
 
 def main():
@@ -340,18 +416,18 @@ def main():
 
     args = parser.parse_args()
 
+    from .cli import setup_logging
+
+    setup_logging("INFO")
+
     faker = USBGadgetFaker()
 
     # Check if running as root
     if os.geteuid() != 0 and not args.check_only:
-        print(
-            "WARNING: Not running as root. Creating USB gadgets requires root privileges.",
-            file=sys.stderr,
-        )
-        print(
-            "Try running with: sudo python -m firmware_investigate.usb_gadget",
-            file=sys.stderr,
+        logger.warning(
+            "WARNING: Not running as root. Creating USB gadgets requires root privileges."
         )
+        logger.warning("Try running with: sudo python -m firmware_investigate.usb_gadget")
 
     if args.cleanup:
         faker.remove_gadget("sena_fake")
@@ -359,35 +435,39 @@ def main():
         return 0
 
     if args.check_only:
-        print("Checking for USB devices...")
+        logger.info("Checking for USB devices...")
         sena_present = faker.check_device_present(SENA_DEVICE.vendor_id, SENA_DEVICE.product_id)
         cardo_present = faker.check_device_present(CARDO_DEVICE.vendor_id, CARDO_DEVICE.product_id)
 
-        print(
-            f"Sena ({SENA_DEVICE.vendor_id}:{SENA_DEVICE.product_id}): "
-            f"{'PRESENT' if sena_present else 'NOT FOUND'}"
+        logger.info(
+            "Sena (%s:%s): %s",
+            SENA_DEVICE.vendor_id,
+            SENA_DEVICE.product_id,
+            "PRESENT" if sena_present else "NOT FOUND",
         )
-        print(
-            f"Cardo ({CARDO_DEVICE.vendor_id}:{CARDO_DEVICE.product_id}): "
-            f"{'PRESENT' if cardo_present else 'NOT FOUND'}"
+        logger.info(
+            "Cardo (%s:%s): %s",
+            CARDO_DEVICE.vendor_id,
+            CARDO_DEVICE.product_id,
+            "PRESENT" if cardo_present else "NOT FOUND",
         )
         return 0
 
     # Create fake devices
-    print("USB Gadget Faker - Creating fake devices if needed")
-    print("-" * 60)
+    logger.info("USB Gadget Faker - Creating fake devices if needed")
+    logger.info("-" * 60)
 
     results = faker.setup_fake_devices(check_existing=not args.force)
 
-    print("\n" + "-" * 60)
-    print("Summary:")
+    logger.info("\n" + "-" * 60)
+    logger.info("Summary:")
     all_success = all(results.values())
     for device, success in results.items():
         status = "✓ OK" if success else "✗ FAILED"
-        print(f"  {device.capitalize()}: {status}")
+        logger.info("  %s: %s", device.capitalize(), status)
 
     if all_success:
-        print("\nYou can verify the devices with: lsusb | grep -E '0003:092b|2685:0900'")
+        logger.info("\nYou can verify the devices with: lsusb | grep -E '0003:092b|2685:0900'")
         return 0
     else:
         return 1
@@ -1,19 +1,56 @@
 """Module for running Windows executables using Wine."""
 
+import logging
 import os
+import re
+import shlex
+import shutil
 import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class WineResult(subprocess.CompletedProcess):
+    """Completed Wine run whose output was written to log files rather than captured.
+
+    ``stdout`` and ``stderr`` are None; read the files at ``stdout_path`` and
+    ``stderr_path`` (inside the runner's log_dir) instead.
+    """
+
+    def __init__(self, args, returncode: int, stdout_path: Path, stderr_path: Path):
+        super().__init__(args, returncode)
+        self.stdout_path = stdout_path
+        self.stderr_path = stderr_path
 
 
 class WineRunner:
     """Runner for executing Windows programs using Wine."""
 
+    __slots__ = (
+        "wine_prefix",
+        "proxy_host",
+        "proxy_port",
+        "log_dir",
+        "keep_logs",
+        "_env_overrides",
+        "_wineserver",
+        "_prefix_ready",
+    )
+
+    # Resolved wine binary (None if unusable) for each PATH probed in this process.
+    _wine_probe_cache: Dict[str, Optional[str]] = {}
+
     def __init__(
         self,
         wine_prefix: Optional[Path] = None,
         proxy_host: str = "127.0.0.1",
         proxy_port: int = 8080,
+        log_dir: Optional[Path] = None,
+        keep_logs: int = 10,
     ):
         """Initialize the Wine runner.
 
@@ -21,52 +58,166 @@ class WineRunner:
             wine_prefix: Custom WINEPREFIX directory.
             proxy_host: Proxy server host for network interception.
             proxy_port: Proxy server port for network interception.
+            log_dir: Directory for the executables' stdout/stderr logs
+                (default: "logs" inside the Wine prefix).
+            keep_logs: Number of stdout and of stderr logs kept per executable;
+                older ones are deleted after each run.
         """
         self.wine_prefix = wine_prefix or Path.home() / ".wine-firmware-investigate"
         self.proxy_host = proxy_host
         self.proxy_port = proxy_port
+        self.log_dir = log_dir or self.wine_prefix / "logs"
+        self.keep_logs = keep_logs
+
+        # The Wine-specific variables depend only on the settings above, so build them once.
+        proxy_url = f"http://{self.proxy_host}:{self.proxy_port}"
+        self._env_overrides = {
+            "WINEPREFIX": str(self.wine_prefix),
+            # Configure proxy settings for Wine
+            "http_proxy": proxy_url,
+            "https_proxy": proxy_url,
+            # Wine debug settings (reduce noise)
+            "WINEDEBUG": "-all",
+        }
+        # wineserver kept alive by start_wineserver(), if any.
+        self._wineserver: Optional[str] = None
+        # Whether wine_prefix is known to exist, so run() can skip the mkdir.
+        self._prefix_ready = False
+
+    def __enter__(self) -> "WineRunner":
+        self.start_wineserver()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop_wineserver()
 
     def setup_environment(self) -> Dict[str, str]:
         """Setup Wine environment variables.
 
+        The current process environment is read on every call so changes to
+        os.environ are always picked up; only the Wine-specific overrides are
+        precomputed.
+
         Returns:
             Dictionary of environment variables for Wine.
         """
         env = os.environ.copy()
-        env["WINEPREFIX"] = str(self.wine_prefix)
-
-        # Configure proxy settings for Wine
-        proxy_url = f"http://{self.proxy_host}:{self.proxy_port}"
-        env["http_proxy"] = proxy_url
-        env["https_proxy"] = proxy_url
-
-        # Wine debug settings (reduce noise)
-        env["WINEDEBUG"] = "-all"
-
+        env.update(self._env_overrides)
         return env
 
     def check_wine_installed(self) -> bool:
         """Check if Wine is installed.
 
+        The result is shared by all runners in the process for as long as
+        PATH is unchanged; see invalidate_wine_cache().
+
         Returns:
             True if Wine is available, False otherwise.
         """
+        return self._find_wine() is not None
+
+    @classmethod
+    def invalidate_wine_cache(cls) -> None:
+        """Forget cached Wine probe results, e.g. after installing Wine."""
+        cls._wine_probe_cache.clear()
+
+    @classmethod
+    def _find_wine(cls) -> Optional[str]:
+        """Return the absolute path of a working wine binary, probing at most once per PATH.
+
+        The probe runs wine by absolute path with close_fds=False, which lets
+        CPython start it with posix_spawn instead of fork+exec; that matters
+        on WSL, where forking the interpreter is slow.
+
+        Returns:
+            Path to wine, or None if it is missing or fails to run.
+        """
+        search_path = os.environ.get("PATH", "")
+        if search_path in cls._wine_probe_cache:
+            return cls._wine_probe_cache[search_path]
+
+        wine_path = shutil.which("wine", path=search_path)
+        if wine_path is not None:
+            try:
+                subprocess.run(
+                    [wine_path, "--version"],
+                    stdout=subprocess.DEVNULL,
+                    stderr=subprocess.DEVNULL,
+                    check=True,
+                    close_fds=False,
+                )
+            except (subprocess.CalledProcessError, OSError):
+                wine_path = None
+        cls._wine_probe_cache[search_path] = wine_path
+        return wine_path
+
+    def _ensure_prefix(self) -> None:
+        """Create the Wine prefix and log directories the first time they are needed."""
+        if not self._prefix_ready:
+            self.wine_prefix.mkdir(parents=True, exist_ok=True)
+            self.log_dir.mkdir(parents=True, exist_ok=True)
+            self._prefix_ready = True
+
+    def start_wineserver(self) -> bool:
+        """Start a persistent wineserver for this prefix.
+
+        Each wine launch normally starts its own wineserver and the server exits
+        once the last program does, so back-to-back runs pay the startup cost
+        every time. While a persistent server is up, run() attaches to it
+        instead. The runner can also be used as a context manager, which stops
+        the server on exit.
+
+        Returns:
+            True if a persistent wineserver is running, False if none could be
+            started (run() still works, just without the warm server).
+        """
+        if self._wineserver is not None:
+            return True
+
+        wine_path = self._find_wine()
+        if wine_path is None:
+            return False
+        wineserver = shutil.which("wineserver") or shutil.which(
+            "wineserver", path=os.path.dirname(wine_path)
+        )
+        if wineserver is None:
+            logger.warning("wineserver not found; each Wine run will start its own server")
+            return False
+
+        self._ensure_prefix()
         try:
+            # wineserver daemonizes itself, so this returns once the server is up.
             subprocess.run(
-                ["wine", "--version"],
-                capture_output=True,
-                check=True,
+                [wineserver, "-p"], env=self.setup_environment(), check=True, close_fds=False
             )
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
+        except (subprocess.CalledProcessError, OSError) as e:
+            logger.warning("Could not start persistent wineserver: %s", e)
             return False
 
+        logger.info("Started persistent wineserver for %s", self.wine_prefix)
+        self._wineserver = wineserver
+        return True
+
+    def stop_wineserver(self) -> None:
+        """Stop the persistent wineserver started by start_wineserver(), if any."""
+        if self._wineserver is None:
+            return
+        wineserver, self._wineserver = self._wineserver, None
+        try:
+            subprocess.run(
+                [wineserver, "-k"], env=self.setup_environment(), check=False, close_fds=False
+            )
+        except OSError as e:
+            logger.warning("Could not stop wineserver: %s", e)
+        else:
+            logger.info("Stopped wineserver for %s", self.wine_prefix)
+
     def run(
         self,
         executable: Path,
         args: Optional[List[str]] = None,
         usb_devices: Optional[List[Dict[str, str]]] = None,
-    ) -> subprocess.CompletedProcess:
+    ) -> WineResult:
         """Run a Windows executable using Wine.
 
         Args:
@@ -76,57 +227,135 @@ class WineRunner:
                         (format: [{"vendor_id": "0x2685", "product_id": "0x0900"}]).
 
         Returns:
-            CompletedProcess object from subprocess.run.
+            WineResult with the exit code and the paths of the stdout/stderr log
+            files, which are named after the executable and kept in log_dir.
 
         Raises:
-            FileNotFoundError: If executable doesn't exist or Wine is not installed.
-            RuntimeError: If Wine execution fails.
+            FileNotFoundError: If executable doesn't exist.
+            RuntimeError: If Wine is not installed or could not be launched; the
+                underlying OSError is chained as its cause.
         """
-        if not self.check_wine_installed():
+        wine_path = self._find_wine()
+        if wine_path is None:
             raise RuntimeError("Wine is not installed. Please install Wine to continue.")
 
         if not executable.exists():
             raise FileNotFoundError(f"Executable not found: {executable}")
 
-        # Create Wine prefix if it doesn't exist
-        self.wine_prefix.mkdir(parents=True, exist_ok=True)
+        self._ensure_prefix()
 
         # Setup environment
         env = self.setup_environment()
 
         # Build command
-        cmd = ["wine", str(executable)]
+        cmd = [wine_path, str(executable)]
         if args:
             cmd.extend(args)
 
-        print(f"Running Wine command: {' '.join(cmd)}")
-        print(f"Using WINEPREFIX: {self.wine_prefix}")
-        print(f"Using proxy: {self.proxy_host}:{self.proxy_port}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Running Wine command: %s", shlex.join(cmd))
+            logger.info("Using WINEPREFIX: %s", self.wine_prefix)
+            logger.info("Using proxy: %s:%s", self.proxy_host, self.proxy_port)
 
-        if usb_devices:
-            print("USB device passthrough:")
-            for device in usb_devices:
-                vendor_id = device.get("vendor_id", "")
-                product_id = device.get("product_id", "")
-                print(f"  - Vendor: {vendor_id}, Product: {product_id}")
-            print("Note: USB passthrough requires additional Wine/QEMU configuration")
+            if usb_devices:
+                logger.info("USB device passthrough:")
+                for device in usb_devices:
+                    vendor_id = device.get("vendor_id", "")
+                    product_id = device.get("product_id", "")
+                    logger.info("  - Vendor: %s, Product: %s", vendor_id, product_id)
+                logger.info("Note: USB passthrough requires additional Wine/QEMU configuration")
 
+        # Installer output can be large, so the child writes it straight to files
+        # instead of having it piped through and decoded in this process. The
+        # names are unique so concurrent or repeated runs keep separate logs.
         try:
-            result = subprocess.run(
-                cmd,
-                env=env,
-                capture_output=True,
-                text=True,
-            )
+            with tempfile.NamedTemporaryFile(
+                prefix=f"{executable.stem}-", suffix=".stdout.log", dir=self.log_dir, delete=False
+            ) as stdout_log, tempfile.NamedTemporaryFile(
+                prefix=f"{executable.stem}-", suffix=".stderr.log", dir=self.log_dir, delete=False
+            ) as stderr_log:
+                completed = subprocess.run(
+                    cmd,
+                    env=env,
+                    stdout=stdout_log,
+                    stderr=stderr_log,
+                    close_fds=False,
+                )
+        except OSError as e:
+            # The prefix or log directory may have been deleted; recreate them next run.
+            self._prefix_ready = False
+            raise RuntimeError(f"Failed to run Wine: {e}") from e
+
+        result = WineResult(cmd, completed.returncode, Path(stdout_log.name), Path(stderr_log.name))
+        self._prune_logs(executable.stem, (result.stdout_path, result.stderr_path))
+        logger.info("Wine execution completed with exit code: %d", result.returncode)
+        logger.info("Wine output logged to: %s, %s", result.stdout_path, result.stderr_path)
 
-            print(f"Wine execution completed with exit code: {result.returncode}")
+        # Only read the logs back when debug logging will actually show them.
+        if logger.isEnabledFor(logging.DEBUG):
+            for name, path in (("STDOUT", result.stdout_path), ("STDERR", result.stderr_path)):
+                output = path.read_text(errors="replace")
+                if output:
+                    logger.debug("%s:\n%s", name, output)
 
-            if result.stdout:
-                print(f"STDOUT:\n{result.stdout}")
-            if result.stderr:
-                print(f"STDERR:\n{result.stderr}")
+        return result
 
-            return result
+    def _prune_logs(self, stem: str, keep: Sequence[Path]) -> None:
+        """Delete all but the newest keep_logs stdout and stderr logs of one executable.
 
-        except Exception as e:
-            raise RuntimeError(f"Failed to run Wine: {e}")
+        Args:
+            stem: Executable name the logs were created for.
+            keep: Log files that must survive, e.g. those of the run just finished.
+        """
+        # Matches the names NamedTemporaryFile gives in run(): "<stem>-<8 random chars><suffix>".
+        pattern = re.compile(re.escape(stem) + r"-[a-z0-9_]{8}\.(stdout|stderr)\.log")
+        logs: Dict[str, List[Tuple[float, str]]] = {"stdout": [], "stderr": []}
+        try:
+            with os.scandir(self.log_dir) as entries:
+                for entry in entries:
+                    match = pattern.fullmatch(entry.name)
+                    if match:
+                        logs[match.group(1)].append((entry.stat().st_mtime, entry.path))
+        except OSError as e:
+            logger.warning("Could not prune Wine logs in %s: %s", self.log_dir, e)
+            return
+
+        kept = {str(path) for path in keep}
+        for found in logs.values():
+            found.sort(reverse=True)
+            for _, path in found[self.keep_logs :]:
+                if path not in kept:
+                    try:
+                        os.unlink(path)
+                    except OSError:
+                        pass
+
+    def run_batch(
+        self,
+        jobs: Sequence[Tuple[Path, Optional[List[str]]]],
+        max_workers: Optional[int] = None,
+    ) -> List[WineResult]:
+        """Run several Windows executables concurrently in this runner's prefix.
+
+        Each job is launched as soon as a worker is free rather than after the
+        previous one exits. Combine with start_wineserver() (or use the runner
+        as a context manager) so every job attaches to the same warm server.
+
+        Args:
+            jobs: (executable, args) pairs, as would be passed to run().
+            max_workers: Maximum number of concurrent Wine processes
+                (default: one per job, capped at 8).
+
+        Returns:
+            One WineResult per job, in the same order as jobs.
+
+        Raises:
+            FileNotFoundError: If an executable doesn't exist.
+            RuntimeError: If Wine is not installed or a Wine execution fails.
+        """
+        if not jobs:
+            return []
+        self._ensure_prefix()
+        workers = max_workers or min(8, len(jobs))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda job: self.run(job[0], job[1]), jobs))
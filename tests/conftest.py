@@ -0,0 +1,12 @@
+"""Shared pytest fixtures."""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def dl_dir(tmp_path_factory):
+    """Working directory shared by tests that only construct downloaders.
+
+    Tests using it must not create files there; use tmp_path for those.
+    """
+    return tmp_path_factory.mktemp("downloaders")
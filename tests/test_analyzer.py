@@ -1,5 +1,8 @@
 """Tests for the strings analyzer module."""
 
+import os
+from unittest.mock import patch
+
 from firmware_investigate.analyzer import StringsAnalyzer
 import pytest
 
@@ -24,15 +27,96 @@ def test_strings_analyzer_analyze_missing_file(tmp_path):
 
 def test_strings_analyzer_analyze_all(tmp_path):
     """Test analyze_all with directory."""
-    analyzer = StringsAnalyzer()
+    analyzer = StringsAnalyzer(cache_dir=tmp_path / "cache")
 
     # Create some test files
     (tmp_path / "test.exe").write_bytes(b"test content")
+    (tmp_path / "UPPER.DLL").write_bytes(b"upper content")
     (tmp_path / "test.txt").write_text("not executable")
 
-    # Note: This test will skip actual analysis if strings command is not available
-    # In a real environment, we'd need strings installed
+    # A directory with an executable-looking name, such as a macOS app bundle.
+    (tmp_path / "Bundle.app").mkdir()
+    (tmp_path / "Bundle.app" / "inner.exe").write_bytes(b"inner content")
+
     results = analyzer.analyze_all(tmp_path)
 
-    # Results is a dict (may be empty if strings command not available)
-    assert isinstance(results, dict)
+    assert results == {"test.exe": ["test content"], "UPPER.DLL": ["upper content"]}
+
+
+def test_strings_analyzer_analyze(tmp_path):
+    """Test extracting printable strings from a binary file."""
+    analyzer = StringsAnalyzer(cache_dir=tmp_path / "cache")
+    binary = tmp_path / "test.bin"
+    binary.write_bytes(b"ab\x00hello world\x01\x02xyz\tabcd\nfoo\xffbarbaz")
+    output_file = tmp_path / "out" / "strings.txt"
+
+    strings_list = analyzer.analyze(binary, output_file=output_file)
+
+    assert strings_list == ["hello world", "xyz\tabcd", "barbaz"]
+    assert output_file.read_text() == "hello world\nxyz\tabcd\nbarbaz\n"
+
+
+def test_strings_analyzer_analyze_empty_file(tmp_path):
+    """Test analyze with an empty file."""
+    analyzer = StringsAnalyzer(cache_dir=tmp_path / "cache")
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+
+    assert analyzer.analyze(empty) == []
+
+
+def test_strings_analyzer_uses_cache(tmp_path):
+    """Test that a second analysis of the same content is served from the cache."""
+    analyzer = StringsAnalyzer(cache_dir=tmp_path / "cache")
+    binary = tmp_path / "test.bin"
+    binary.write_bytes(b"\x00cached string\x00")
+
+    assert analyzer.analyze(binary) == ["cached string"]
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+    with patch.object(StringsAnalyzer, "_iter_strings", side_effect=AssertionError("cache miss")):
+        assert analyzer.analyze(binary) == ["cached string"]
+
+
+def test_strings_analyzer_default_cache_is_per_user(tmp_path, monkeypatch):
+    """Test the default cache lives under $XDG_CACHE_HOME and is created private."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "xdg"))
+    analyzer = StringsAnalyzer()
+    assert analyzer.cache_dir == tmp_path / "xdg" / "firmware_investigate" / "strings"
+
+    binary = tmp_path / "test.bin"
+    binary.write_bytes(b"\x00private\x00")
+    assert analyzer.analyze(binary) == ["private"]
+    assert analyzer.cache_dir.stat().st_mode & 0o777 == 0o700
+
+
+def _poison_cache(analyzer, binary):
+    """Analyze binary once, then replace its cache entry with planted strings."""
+    analyzer.analyze(binary)
+    [entry] = analyzer.cache_dir.iterdir()
+    entry.write_text("planted\n")
+
+
+def test_strings_analyzer_ignores_cache_writable_by_others(tmp_path):
+    """Test a cache directory other users can write to is not trusted."""
+    analyzer = StringsAnalyzer(cache_dir=tmp_path / "cache")
+    binary = tmp_path / "test.bin"
+    binary.write_bytes(b"\x00real string\x00")
+    _poison_cache(analyzer, binary)
+    analyzer.cache_dir.chmod(0o777)
+    output_file = tmp_path / "strings.txt"
+
+    assert analyzer.analyze(binary, output_file=output_file) == ["real string"]
+    assert output_file.read_text() == "real string\n"
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="needs POSIX user IDs")
+def test_strings_analyzer_ignores_cache_owned_by_another_user(tmp_path):
+    """Test cache entries are only trusted when the current user owns them."""
+    analyzer = StringsAnalyzer(cache_dir=tmp_path / "cache")
+    binary = tmp_path / "test.bin"
+    binary.write_bytes(b"\x00real string\x00")
+    _poison_cache(analyzer, binary)
+
+    with patch("os.getuid", return_value=os.getuid() + 1):
+        assert analyzer.analyze(binary) == ["real string"]
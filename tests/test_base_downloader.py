@@ -1,7 +1,9 @@
 """Tests for base downloader functionality."""
 
-import tempfile
-from pathlib import Path
+import io
+import json
+import urllib.error
+from unittest.mock import patch
 
 from firmware_investigate.downloaders.base import BaseDownloader
 
@@ -9,54 +11,195 @@ from firmware_investigate.downloaders.base import BaseDownloader
 class MockDownloader(BaseDownloader):
     """Mock implementation of BaseDownloader."""
 
-    def get_url(self) -> str:
-        return "https://example.com/test.exe"
+    url = "https://example.com/test.exe"
+    filename = "test.exe"
 
-    def get_filename(self) -> str:
-        return "test.exe"
 
-
-def test_downloader_initialization():
+def test_downloader_initialization(dl_dir):
     """Test that downloader initializes correctly."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        downloader = MockDownloader(working_dir=tmpdir)
-        assert downloader.working_dir == Path(tmpdir)
-        assert downloader.working_dir.exists()
+    downloader = MockDownloader(working_dir=str(dl_dir))
+    assert downloader.working_dir == dl_dir
+    assert downloader.working_dir.exists()
 
 
-def test_downloader_platform_override():
+def test_downloader_platform_override(dl_dir):
     """Test that platform override works."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        downloader = MockDownloader(working_dir=tmpdir, platform_override="windows")
-        assert downloader.platform == "windows"
+    downloader = MockDownloader(working_dir=str(dl_dir), platform_override="windows")
+    assert downloader.platform == "windows"
 
 
-def test_get_filepath():
+def test_get_filepath(dl_dir):
     """Test filepath generation."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        downloader = MockDownloader(working_dir=tmpdir)
-        filepath = downloader.get_filepath()
-        assert filepath == Path(tmpdir) / "test.exe"
+    downloader = MockDownloader(working_dir=str(dl_dir))
+    filepath = downloader.get_filepath()
+    assert filepath == dl_dir / "test.exe"
 
 
-def test_file_exists():
+def test_file_exists(tmp_path):
     """Test file existence check."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        downloader = MockDownloader(working_dir=tmpdir)
+    downloader = MockDownloader(working_dir=str(tmp_path))
 
-        # File doesn't exist initially
-        assert not downloader.file_exists()
+    # File doesn't exist initially
+    assert not downloader.file_exists()
 
-        # Create the file
-        downloader.get_filepath().touch()
+    # Create the file
+    downloader.get_filepath().touch()
 
-        # Now it exists
-        assert downloader.file_exists()
+    # Now it exists
+    assert downloader.file_exists()
 
 
-def test_working_dir_creation():
+def test_working_dir_creation(tmp_path):
     """Test that working directory is created if it doesn't exist."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        working_path = Path(tmpdir) / "subdir" / "working"
-        MockDownloader(working_dir=str(working_path))
-        assert working_path.exists()
+    working_path = tmp_path / "subdir" / "working"
+    MockDownloader(working_dir=str(working_path))
+    assert working_path.exists()
+
+
+class FakeResponse(io.BytesIO):
+    """Minimal stand-in for the object returned by urlopen."""
+
+    def __init__(self, body: bytes, status: int = 200, headers=None):
+        super().__init__(body)
+        self.status = status
+        self.headers = headers or {}
+
+
+def test_download_writes_file_and_metadata(tmp_path):
+    """Test that a fresh download stores the file and its validators."""
+    downloader = MockDownloader(working_dir=str(tmp_path))
+    response = FakeResponse(b"firmware", headers={"ETag": '"abc"'})
+
+    with patch("urllib.request.urlopen", return_value=response):
+        result = downloader.download()
+
+    assert result == downloader.get_filepath()
+    assert result.read_bytes() == b"firmware"
+    metadata = json.loads(downloader.get_metadata_path().read_text())
+    assert metadata == {"etag": '"abc"', "last_modified": None, "complete": True}
+
+
+def test_download_resumes_partial_file(tmp_path):
+    """Test that an incomplete download is resumed with a range request."""
+    downloader = MockDownloader(working_dir=str(tmp_path))
+    downloader.get_filepath().write_bytes(b"firm")
+    downloader.get_metadata_path().write_text(json.dumps({"etag": '"abc"', "complete": False}))
+    response = FakeResponse(b"ware", status=206, headers={"ETag": '"abc"'})
+
+    with patch("urllib.request.urlopen", return_value=response) as mock_urlopen:
+        downloader.download()
+
+    request = mock_urlopen.call_args[0][0]
+    assert request.get_header("Range") == "bytes=4-"
+    assert request.get_header("If-range") == '"abc"'
+    assert downloader.get_filepath().read_bytes() == b"firmware"
+
+
+def test_forced_download_not_modified(tmp_path):
+    """Test that a forced download of an unchanged file is skipped on 304."""
+    downloader = MockDownloader(working_dir=str(tmp_path))
+    downloader.get_filepath().write_bytes(b"firmware")
+    downloader.get_metadata_path().write_text(json.dumps({"etag": '"abc"', "complete": True}))
+    not_modified = urllib.error.HTTPError(downloader.url, 304, "Not Modified", {}, None)
+
+    with patch("urllib.request.urlopen", side_effect=not_modified) as mock_urlopen:
+        assert downloader.download(force=True) is None
+
+    request = mock_urlopen.call_args[0][0]
+    assert request.get_header("If-none-match") == '"abc"'
+    assert downloader.get_filepath().read_bytes() == b"firmware"
+
+
+def test_platform_override_skips_detection(tmp_path):
+    """Test that platform detection is not run when an override is given."""
+    with patch.object(MockDownloader, "_detect_platform") as mock_detect:
+        MockDownloader(working_dir=str(tmp_path), platform_override="darwin")
+    mock_detect.assert_not_called()
+
+
+def test_download_skips_existing_file(tmp_path):
+    """Test that an existing complete file is not downloaded again."""
+    downloader = MockDownloader(working_dir=str(tmp_path))
+    downloader.get_filepath().write_bytes(b"firmware")
+
+    with patch("urllib.request.urlopen") as mock_urlopen:
+        assert downloader.download() is None
+    mock_urlopen.assert_not_called()
+
+
+def test_download_replaces_empty_file(tmp_path):
+    """Test that an empty leftover file is downloaded again."""
+    downloader = MockDownloader(working_dir=str(tmp_path))
+    downloader.get_filepath().touch()
+
+    with patch("urllib.request.urlopen", return_value=FakeResponse(b"firmware")):
+        assert downloader.download() == downloader.get_filepath()
+    assert downloader.get_filepath().read_bytes() == b"firmware"
+
+
+def _write_partial(downloader, body: bytes):
+    """Leave a download on disk that its metadata marks as incomplete."""
+    downloader.get_filepath().write_bytes(body)
+    downloader.get_metadata_path().write_text(json.dumps({"etag": '"abc"', "complete": False}))
+
+
+def test_resume_416_with_matching_size_marks_complete(tmp_path):
+    """Test a fully written file left marked incomplete is accepted on 416."""
+    downloader = MockDownloader(working_dir=str(tmp_path))
+    _write_partial(downloader, b"firmware")
+    not_satisfiable = urllib.error.HTTPError(
+        downloader.url, 416, "Range Not Satisfiable", {"Content-Range": "bytes */8"}, None
+    )
+
+    with patch("urllib.request.urlopen", side_effect=not_satisfiable) as mock_urlopen:
+        assert downloader.download() is None
+
+    mock_urlopen.assert_called_once()
+    assert json.loads(downloader.get_metadata_path().read_text())["complete"] is True
+    assert downloader.get_filepath().read_bytes() == b"firmware"
+
+
+def test_resume_416_with_other_size_restarts_download(tmp_path):
+    """Test an unresumable partial file is discarded and downloaded afresh."""
+    downloader = MockDownloader(working_dir=str(tmp_path))
+    _write_partial(downloader, b"firmware-stale")
+    not_satisfiable = urllib.error.HTTPError(
+        downloader.url, 416, "Range Not Satisfiable", {"Content-Range": "bytes */8"}, None
+    )
+
+    with patch(
+        "urllib.request.urlopen", side_effect=[not_satisfiable, FakeResponse(b"firmware")]
+    ) as mock_urlopen:
+        assert downloader.download() == downloader.get_filepath()
+
+    retry = mock_urlopen.call_args_list[1][0][0]
+    assert retry.get_header("Range") is None
+    assert downloader.get_filepath().read_bytes() == b"firmware"
+
+
+def test_partial_file_without_validator_starts_over(tmp_path):
+    """Test a partial file with no ETag/Last-Modified is not resumed blindly."""
+    downloader = MockDownloader(working_dir=str(tmp_path))
+    downloader.get_filepath().write_bytes(b"stale")
+    downloader.get_metadata_path().write_text(json.dumps({"etag": None, "complete": False}))
+
+    with patch("urllib.request.urlopen", return_value=FakeResponse(b"firmware")) as mock_urlopen:
+        assert downloader.download() == downloader.get_filepath()
+
+    request = mock_urlopen.call_args[0][0]
+    assert request.get_header("Range") is None
+    assert request.get_header("If-range") is None
+    assert downloader.get_filepath().read_bytes() == b"firmware"
+
+
+def test_forced_download_of_partial_file_starts_over(tmp_path):
+    """Test force=True downloads an incomplete file from the start."""
+    downloader = MockDownloader(working_dir=str(tmp_path))
+    _write_partial(downloader, b"firm")
+
+    with patch("urllib.request.urlopen", return_value=FakeResponse(b"firmware")) as mock_urlopen:
+        assert downloader.download(force=True) == downloader.get_filepath()
+
+    request = mock_urlopen.call_args[0][0]
+    assert request.get_header("Range") is None
+    assert downloader.get_filepath().read_bytes() == b"firmware"
@@ -0,0 +1,127 @@
+"""Tests for the command-line interface."""
+
+import logging
+import subprocess
+import sys
+from unittest.mock import patch
+
+import pytest
+
+from firmware_investigate import cli
+from firmware_investigate.downloaders.cardo import CardoDownloader
+from firmware_investigate.downloaders.sena import SenaDownloader
+
+
+@pytest.fixture
+def package_logger():
+    """Restore the loggers configured by setup_logging() after the test."""
+    loggers = [logging.getLogger(name) for name in cli._LOGGER_NAMES]
+    saved = [(log.level, log.handlers[:], log.propagate) for log in loggers]
+    saved_cli_handlers = cli._log_handlers[:]
+    yield loggers[0]
+    for log, (level, handlers, propagate) in zip(loggers, saved):
+        log.level, log.handlers[:], log.propagate = level, handlers, propagate
+    cli._log_handlers[:] = saved_cli_handlers
+
+
+def test_build_parser_is_cached():
+    """Test that the argument parser is only built once per process."""
+    assert cli._build_parser() is cli._build_parser()
+
+
+def test_load_vendors():
+    """Test vendor selection from the vendor table."""
+    assert cli._load_vendors("sena") == [("Sena", SenaDownloader)]
+    assert cli._load_vendors("all") == [("Sena", SenaDownloader), ("Cardo", CardoDownloader)]
+
+
+def test_main_rejects_unknown_vendor():
+    """Test that an unknown vendor is rejected by argument parsing."""
+    with pytest.raises(SystemExit):
+        cli.main(["--vendor", "unknown"])
+
+
+def test_main_downloads_selected_vendor(tmp_path):
+    """Test that main downloads only the selected vendor."""
+    with patch.object(CardoDownloader, "download", return_value=None) as mock_cardo:
+        with patch.object(SenaDownloader, "download") as mock_sena:
+            exit_code = cli.main(
+                ["--vendor", "cardo", "--platform", "windows", "--working-dir", str(tmp_path)]
+            )
+
+    assert exit_code == 0
+    mock_cardo.assert_called_once_with(force=False)
+    mock_sena.assert_not_called()
+
+
+def test_main_reports_download_failure(tmp_path):
+    """Test that a failed vendor download gives a non-zero exit code."""
+    with patch.object(CardoDownloader, "download", side_effect=RuntimeError("boom")):
+        with patch.object(SenaDownloader, "download", return_value=None) as mock_sena:
+            exit_code = cli.main(["--platform", "windows", "--working-dir", str(tmp_path)])
+
+    assert exit_code == 1
+    mock_sena.assert_called_once_with(force=False)
+
+
+def test_main_reports_unchanged_forced_download(tmp_path, caplog):
+    """Test a forced download answered with 304 is not reported as a skipped one."""
+    with patch.object(CardoDownloader, "download", return_value=None):
+        with caplog.at_level("INFO", logger="firmware_investigate"):
+            argv = ["--vendor", "cardo", "--force", "--working-dir", str(tmp_path)]
+            assert cli.main(argv) == 0
+
+    assert "304 Not Modified" in caplog.text
+    assert "use --force" not in caplog.text
+
+
+def test_main_log_level_applies_on_repeated_calls(capsys, package_logger):
+    """Test each in-process main() call uses its own --log-level."""
+    with patch("firmware_investigate.usb_gadget.USBGadgetFaker.check_device_present") as check:
+        check.return_value = False
+        argv = ["--check-usb-devices", "--log-level"]
+        assert cli.main([*argv, "INFO"], configure_logging=True) == 0
+        assert "Checking for USB devices" in capsys.readouterr().out
+
+        assert cli.main([*argv, "ERROR"], configure_logging=True) == 0
+        assert capsys.readouterr().out == ""
+
+
+def test_main_with_argv_keeps_caller_logging(package_logger):
+    """Test that main(argv) leaves the caller's logging configuration alone."""
+    before = (package_logger.level, package_logger.handlers[:], package_logger.propagate)
+    with patch("firmware_investigate.usb_gadget.USBGadgetFaker.check_device_present") as check:
+        check.return_value = False
+        assert cli.main(["--check-usb-devices", "--log-level", "ERROR"]) == 0
+
+    assert (package_logger.level, package_logger.handlers, package_logger.propagate) == before
+
+
+def test_main_configures_logging_as_entry_point(package_logger):
+    """Test that the console-script call main() installs the CLI handlers."""
+    with patch("sys.argv", ["firmware-investigate", "--check-usb-devices", "--log-level", "ERROR"]):
+        with patch("firmware_investigate.usb_gadget.USBGadgetFaker.check_device_present"):
+            assert cli.main() == 0
+
+    assert package_logger.level == logging.ERROR
+    assert not package_logger.propagate
+    assert all(handler in package_logger.handlers for handler in cli._log_handlers)
+
+
+def test_main_imports_only_selected_vendor(tmp_path):
+    """Test that --vendor sena does not import the Cardo downloader."""
+    script = (
+        "import sys\n"
+        "from unittest.mock import patch\n"
+        "from firmware_investigate import cli\n"
+        "with patch('firmware_investigate.downloaders.sena.SenaDownloader.download'):\n"
+        "    cli.main(['--vendor', 'sena', '--working-dir', sys.argv[1]])\n"
+        "print('firmware_investigate.downloaders.cardo' in sys.modules)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script, str(tmp_path)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "False"
@@ -0,0 +1,14 @@
+"""Tests for the end-to-end workflow script."""
+
+from unittest.mock import patch
+
+from firmware_investigate import e2e
+
+
+def test_run_e2e_rejects_unknown_vendor(tmp_path, caplog):
+    """Test an unknown vendor fails cleanly instead of starting an empty worker pool."""
+    with patch.object(e2e, "MitmproxyManager") as mitm:
+        assert e2e.run_e2e("unknown", tmp_path / "working") == 1
+
+    assert "Unknown vendor: unknown" in caplog.text
+    mitm.assert_not_called()
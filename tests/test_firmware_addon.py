@@ -0,0 +1,158 @@
+"""Tests for the mitmproxy firmware addon."""
+
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from firmware_investigate import mitmproxy_manager
+
+
+class FakeHeaders:
+    """Minimal stand-in for mitmproxy's multi-valued, case-insensitive headers."""
+
+    def __init__(self, pairs):
+        self.pairs = pairs
+
+    def items(self, multi=False):
+        return list(self.pairs) if multi else list(dict(self.pairs).items())
+
+    def get(self, name, default=None):
+        for key, value in reversed(self.pairs):
+            if key.lower() == name.lower():
+                return value
+        return default
+
+
+def _response(raw_content=b"", headers=(), status_code=200):
+    """Build a response object with the attributes the addon reads."""
+    return SimpleNamespace(
+        status_code=status_code,
+        headers=FakeHeaders(list(headers)),
+        raw_content=raw_content,
+        timestamp_end=2.0,
+        get_content=lambda strict=True: raw_content,
+    )
+
+
+def _flow(url="http://example.com/index.html", response=None):
+    """Build a flow for a GET of url."""
+    request = SimpleNamespace(
+        method="GET",
+        url=url,
+        pretty_url=url,
+        headers=FakeHeaders([("Host", "example.com")]),
+        timestamp_start=1.0,
+    )
+    return SimpleNamespace(request=request, response=response)
+
+
+def _load_addon_module():
+    """Load the addon script by path, as mitmdump -s does."""
+    spec = importlib.util.spec_from_file_location("firmware_addon", mitmproxy_manager._ADDON_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def addon_module(tmp_path, monkeypatch):
+    """A freshly loaded addon module writing to tmp_path."""
+    monkeypatch.setenv("OUTDIR", str(tmp_path))
+    module = _load_addon_module()
+    yield module
+    for addon in module.addons:
+        for fp in (addon.req_fp, addon.resp_fp):
+            fp.close()
+
+
+def _read_records(path: Path):
+    """Parse a JSONL log file."""
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_dumps_without_orjson_matches_orjson(tmp_path, monkeypatch, addon_module):
+    """Test the json fallback writes the same newline-terminated records as orjson."""
+    record = {"id": 1, "url": "http://example.com/ü", "headers": [["A", "b"]]}
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    fallback = _load_addon_module()
+    try:
+        encoded = fallback._dumps(record)
+        assert encoded.endswith(b"\n")
+        assert json.loads(encoded) == record
+        assert json.loads(addon_module._dumps(record)) == record
+    finally:
+        fallback.addons[0].req_fp.close()
+        fallback.addons[0].resp_fp.close()
+
+
+def test_header_pairs_keeps_duplicate_headers(addon_module):
+    """Test repeated headers such as Set-Cookie are all kept, in order."""
+    headers = FakeHeaders([("Set-Cookie", "a=1"), ("Set-Cookie", "b=2"), ("X", "y")])
+    assert addon_module._header_pairs(headers) == [
+        ("Set-Cookie", "a=1"),
+        ("Set-Cookie", "b=2"),
+        ("X", "y"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [("42", 42), (" 7 ", 7), ("-1", 3), ("1_000", 3), ("abc", 3), (None, 3)],
+)
+def test_content_length_falls_back_to_body_size(addon_module, header, expected):
+    """Test only an all-digit Content-Length is trusted."""
+    headers = [] if header is None else [("Content-Length", header)]
+    response = _response(raw_content=b"abc", headers=headers)
+    assert addon_module.FirmwareAddon._content_length(response) == expected
+
+
+def test_response_records_and_saves_firmware(tmp_path, addon_module):
+    """Test a firmware response is logged and its body saved."""
+    addon = addon_module.addons[0]
+    response = _response(raw_content=b"\x00fw", headers=[("Content-Length", "3")])
+    flow = _flow("http://example.com/update.BIN?x=1", response)
+
+    asyncio.run(addon.request(flow))
+    asyncio.run(addon.response(flow))
+    addon.done()
+
+    assert (tmp_path / "firmware_1.bin").read_bytes() == b"\x00fw"
+    [record] = _read_records(tmp_path / "responses.jsonl")
+    assert record["content_length"] == 3
+    assert _read_records(tmp_path / "requests.jsonl")[0]["headers"] == [["Host", "example.com"]]
+
+
+def test_write_record_flushes_every_64_records(tmp_path, addon_module):
+    """Test records reach the files in batches of LOG_FLUSH_EVERY."""
+    addon = addon_module.addons[0]
+    flush_every = addon_module.LOG_FLUSH_EVERY
+
+    for n in range(flush_every - 1):
+        addon._write_record(addon.req_fp, {"id": n})
+    assert (tmp_path / "requests.jsonl").read_bytes() == b""
+
+    addon._write_record(addon.resp_fp, {"id": flush_every})
+    assert len(_read_records(tmp_path / "requests.jsonl")) == flush_every - 1
+    assert len(_read_records(tmp_path / "responses.jsonl")) == 1
+    assert addon._unflushed == 0
+
+
+def test_done_syncs_and_closes_logs(tmp_path, monkeypatch, addon_module):
+    """Test done() flushes, syncs and closes both log files."""
+    addon = addon_module.addons[0]
+    addon._write_record(addon.req_fp, {"id": 1})
+    synced = []
+    monkeypatch.setattr(os, "fdatasync", synced.append, raising=False)
+    fds = [addon.req_fp.fileno(), addon.resp_fp.fileno()]
+
+    addon.done()
+
+    assert synced == fds
+    assert addon.req_fp.closed and addon.resp_fp.closed
+    assert _read_records(tmp_path / "requests.jsonl") == [{"id": 1}]
@@ -1,5 +1,13 @@
 """Tests for the mitmproxy manager module."""
 
+import json
+import os
+import socket
+import sys
+from unittest.mock import patch
+
+import pytest
+
 from firmware_investigate.mitmproxy_manager import MitmproxyManager
 
 
@@ -24,3 +32,130 @@ def test_mitmproxy_manager_check_installed():
     # This will return True or False depending on whether mitmproxy is installed
     result = manager.check_mitmproxy_installed()
     assert isinstance(result, bool)
+
+
+def test_mitmproxy_manager_check_installed_is_cached():
+    """Test the installation check only probes once unless refreshed."""
+    manager = MitmproxyManager()
+
+    with patch(
+        "firmware_investigate.mitmproxy_manager.shutil.which", return_value="/usr/bin/mitmdump"
+    ) as mock_which:
+        assert manager.check_mitmproxy_installed() is True
+        assert manager.check_mitmproxy_installed() is True
+        assert mock_which.call_count == 1
+
+        mock_which.return_value = None
+        assert manager.check_mitmproxy_installed(refresh=True) is False
+        assert mock_which.call_count == 2
+
+
+FAKE_MITMDUMP = """#!{python}
+import json
+import os
+import socket
+import sys
+import time
+
+with open(os.path.join(os.environ["OUTDIR"], "env.json"), "w") as f:
+    json.dump(dict(os.environ), f)
+args = sys.argv[1:]
+if {fail}:
+    print("boom", file=sys.stderr)
+    sys.exit(1)
+server = socket.socket()
+server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+server.bind(("127.0.0.1", int(args[args.index("-p") + 1])))
+server.listen()
+time.sleep(30)
+"""
+
+
+def _install_fake_mitmdump(tmp_path, monkeypatch, fail=False):
+    """Put a stand-in mitmdump script first on PATH."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "mitmdump"
+    script.write_text(FAKE_MITMDUMP.format(python=sys.executable, fail=fail))
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+
+
+def _free_port():
+    """Return a currently unused local TCP port."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_mitmproxy_manager_start_waits_for_listener(tmp_path, monkeypatch):
+    """Test start() returns once mitmdump accepts connections."""
+    _install_fake_mitmdump(tmp_path, monkeypatch)
+    manager = MitmproxyManager(port=_free_port(), output_dir=tmp_path / "mitm")
+
+    process = manager.start(background=True)
+    try:
+        assert process is not None
+        assert process.poll() is None
+    finally:
+        manager.stop()
+    assert manager.process is None
+
+
+def test_mitmproxy_manager_reports_status_through_logging(tmp_path, monkeypatch, capsys, caplog):
+    """Test start/stop status goes to the module logger, so --log-level applies to it."""
+    _install_fake_mitmdump(tmp_path, monkeypatch)
+    manager = MitmproxyManager(port=_free_port(), output_dir=tmp_path / "mitm")
+
+    with caplog.at_level("INFO", logger="firmware_investigate.mitmproxy_manager"):
+        manager.start(background=True)
+        manager.stop()
+
+    assert "mitmproxy started in background" in caplog.text
+    assert "mitmproxy stopped" in caplog.text
+    assert capsys.readouterr().out == ""
+
+
+def test_mitmproxy_manager_start_reports_early_exit(tmp_path, monkeypatch):
+    """Test start() surfaces stderr when mitmdump exits during startup."""
+    _install_fake_mitmdump(tmp_path, monkeypatch, fail=True)
+    manager = MitmproxyManager(port=_free_port(), output_dir=tmp_path / "mitm")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        manager.start(background=True)
+    assert manager.process is None
+    assert (tmp_path / "mitm" / "mitmdump.stderr.log").read_text() == "boom\n"
+
+
+def test_mitmproxy_manager_start_rejects_port_in_use(tmp_path, monkeypatch):
+    """Test start() fails instead of mistaking another listener for mitmdump."""
+    _install_fake_mitmdump(tmp_path, monkeypatch)
+    with socket.socket() as other:
+        other.bind(("127.0.0.1", 0))
+        other.listen()
+        manager = MitmproxyManager(port=other.getsockname()[1], output_dir=tmp_path / "mitm")
+
+        with pytest.raises(RuntimeError, match="already in use"):
+            manager.start(background=True)
+    assert manager.process is None
+
+
+def test_mitmproxy_manager_start_passes_proxy_settings(tmp_path, monkeypatch):
+    """Test mitmdump inherits proxy, locale and path settings but not unrelated variables."""
+    _install_fake_mitmdump(tmp_path, monkeypatch)
+    monkeypatch.setenv("HTTPS_PROXY", "http://upstream:3128")
+    monkeypatch.setenv("no_proxy", "localhost")
+    monkeypatch.setenv("LC_CTYPE", "C.UTF-8")
+    monkeypatch.setenv("PYTHONPATH", str(tmp_path / "site"))
+    monkeypatch.setenv("UNRELATED_SECRET", "hidden")
+    manager = MitmproxyManager(port=_free_port(), output_dir=tmp_path / "mitm")
+
+    manager.start(background=True)
+    manager.stop()
+
+    env = json.loads((tmp_path / "mitm" / "env.json").read_text())
+    assert env["HTTPS_PROXY"] == "http://upstream:3128"
+    assert env["no_proxy"] == "localhost"
+    assert env["LC_CTYPE"] == "C.UTF-8"
+    assert env["PYTHONPATH"] == str(tmp_path / "site")
+    assert "UNRELATED_SECRET" not in env
@@ -1,42 +1,28 @@
 """Tests for Sena downloader."""
 
-import tempfile
-from pathlib import Path
+import pytest
 
 from firmware_investigate.downloaders.sena import SenaDownloader
 
 
-def test_sena_downloader_url_windows():
-    """Test that Sena downloader returns correct URL for Windows."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        downloader = SenaDownloader(working_dir=tmpdir, platform_override="windows")
-        assert downloader.get_url() == SenaDownloader.SENA_WINDOWS_URL
+@pytest.mark.parametrize(
+    "platform,url_attr,filename",
+    [
+        ("windows", "SENA_WINDOWS_URL", "SenaDeviceManagerForWindows-v4.4.16-setup_x64.exe"),
+        ("darwin", "SENA_MACOS_URL", "SENADeviceManagerForMAC-v4.4.16.pkg"),
+        # An unrecognized platform falls back to the Windows download.
+        ("linux", "SENA_WINDOWS_URL", "SenaDeviceManagerForWindows-v4.4.16-setup_x64.exe"),
+    ],
+)
+def test_sena_downloader_url_and_filename(dl_dir, platform, url_attr, filename):
+    """Test that Sena downloader returns the correct URL and filename per platform."""
+    downloader = SenaDownloader(working_dir=str(dl_dir), platform_override=platform)
+    assert downloader.url == getattr(SenaDownloader, url_attr)
+    assert downloader.filename == filename
 
 
-def test_sena_downloader_url_macos():
-    """Test that Sena downloader returns correct URL for macOS."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        downloader = SenaDownloader(working_dir=tmpdir, platform_override="darwin")
-        assert downloader.get_url() == SenaDownloader.SENA_MACOS_URL
-
-
-def test_sena_downloader_filename_windows():
-    """Test that Sena downloader returns correct filename for Windows."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        downloader = SenaDownloader(working_dir=tmpdir, platform_override="windows")
-        assert downloader.get_filename() == "SenaDeviceManagerForWindows-v4.4.16-setup_x64.exe"
-
-
-def test_sena_downloader_filename_macos():
-    """Test that Sena downloader returns correct filename for macOS."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        downloader = SenaDownloader(working_dir=tmpdir, platform_override="darwin")
-        assert downloader.get_filename() == "SENADeviceManagerForMAC-v4.4.16.pkg"
-
-
-def test_sena_downloader_filepath():
+def test_sena_downloader_filepath(dl_dir):
     """Test that Sena downloader generates correct filepath."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        downloader = SenaDownloader(working_dir=tmpdir, platform_override="windows")
-        expected_path = Path(tmpdir) / "SenaDeviceManagerForWindows-v4.4.16-setup_x64.exe"
-        assert downloader.get_filepath() == expected_path
+    downloader = SenaDownloader(working_dir=str(dl_dir), platform_override="windows")
+    expected_path = dl_dir / "SenaDeviceManagerForWindows-v4.4.16-setup_x64.exe"
+    assert downloader.get_filepath() == expected_path
@@ -1,7 +1,12 @@
 """Tests for USB gadget faker."""
 
+import os
+from types import SimpleNamespace
+from typing import Optional, get_type_hints
 from unittest.mock import Mock, patch
 
+import pytest
+
 from firmware_investigate.usb_gadget import (
     CARDO_DEVICE,
     SENA_DEVICE,
@@ -10,6 +15,23 @@ from firmware_investigate.usb_gadget import (
 )
 
 
+@pytest.fixture(autouse=True)
+def fake_run(monkeypatch):
+    """Stub out subprocess.run so no test shells out to the real lsusb.
+
+    Tests adjust the returned mock's return_value or side_effect as needed.
+    """
+    run = Mock(return_value=SimpleNamespace(stdout="", returncode=0))
+    monkeypatch.setattr("firmware_investigate.usb_gadget.subprocess.run", run)
+    return run
+
+
+@pytest.fixture(scope="module")
+def faker():
+    """A USBGadgetFaker shared by tests that only read from it."""
+    return USBGadgetFaker()
+
+
 def test_usb_device_config():
     """Test USB device configuration initialization."""
     config = USBDeviceConfig(
@@ -27,139 +49,203 @@ def test_usb_device_config():
     assert config.serial == "TEST123"
 
 
-def test_sena_device_config():
-    """Test Sena device configuration."""
-    assert SENA_DEVICE.vendor_id == "0x0003"
-    assert SENA_DEVICE.product_id == "0x092b"
-    assert "Sena" in SENA_DEVICE.manufacturer
-
-
-def test_cardo_device_config():
-    """Test Cardo device configuration."""
-    assert CARDO_DEVICE.vendor_id == "0x2685"
-    assert CARDO_DEVICE.product_id == "0x0900"
-    assert "Cardo" in CARDO_DEVICE.manufacturer
+@pytest.mark.parametrize(
+    "device,vendor_id,product_id,manufacturer",
+    [
+        (SENA_DEVICE, "0x0003", "0x092b", "Sena"),
+        (CARDO_DEVICE, "0x2685", "0x0900", "Cardo"),
+    ],
+    ids=["sena", "cardo"],
+)
+def test_known_device_configs(device, vendor_id, product_id, manufacturer):
+    """Test the built-in Sena and Cardo device configurations."""
+    assert device.vendor_id == vendor_id
+    assert device.product_id == product_id
+    assert manufacturer in device.manufacturer
 
 
-def test_usb_gadget_faker_initialization():
+def test_usb_gadget_faker_initialization(faker):
     """Test USBGadgetFaker initialization."""
-    faker = USBGadgetFaker()
     assert faker.gadgets_created == []
 
 
-def test_is_configfs_available_false():
-    """Test configfs availability check when not available."""
-    faker = USBGadgetFaker()
-    # In most test environments, configfs won't be available
-    result = faker.is_configfs_available()
-    # This will typically be False in test environment
-    assert isinstance(result, bool)
-
-
-def test_check_device_present_with_lsusb():
+@pytest.mark.parametrize(
+    "method,return_type",
+    [
+        (USBGadgetFaker.is_configfs_available, bool),
+        (USBGadgetFaker.check_device_present, bool),
+        (USBGadgetFaker.get_available_udc, Optional[str]),
+    ],
+)
+def test_probe_return_types(method, return_type):
+    """Test the probes are annotated with the types callers rely on."""
+    assert get_type_hints(method)["return"] == return_type
+
+
+@pytest.mark.parametrize(
+    "lsusb_id,vendor_id,product_id,expected",
+    [
+        ("0003:092b", "0x0003", "0x092b", True),
+        ("0003:092b", "0003", "092b", True),
+        ("0003:092b", "0x2685", "0x0900", False),
+        # Matching is case insensitive
+        ("0003:092B", "0x0003", "0x092b", True),
+        ("0003:092B", "0x0003", "0x092B", True),
+    ],
+)
+def test_check_device_present_with_lsusb(
+    tmp_path, fake_run, lsusb_id, vendor_id, product_id, expected
+):
     """Test device presence check with mocked lsusb."""
     faker = USBGadgetFaker()
+    faker.SYSFS_USB_PATH = tmp_path / "missing"
+    faker._lsusb_path = "/usr/bin/lsusb"
+    fake_run.return_value.stdout = f"Bus 001 Device 002: ID {lsusb_id} Sena Technologies"
 
-    # Mock lsusb output showing Sena device
-    mock_result = Mock()
-    mock_result.stdout = "Bus 001 Device 002: ID 0003:092b Sena Technologies"
-    mock_result.returncode = 0
+    assert faker.check_device_present(vendor_id, product_id) is expected
 
-    with patch("subprocess.run", return_value=mock_result):
-        assert faker.check_device_present("0x0003", "0x092b") is True
-        assert faker.check_device_present("0003", "092b") is True
-        assert faker.check_device_present("0x2685", "0x0900") is False
 
-
-def test_check_device_present_without_lsusb():
+def test_check_device_present_without_lsusb(tmp_path, fake_run):
     """Test device presence check when lsusb is not available."""
     faker = USBGadgetFaker()
+    faker.SYSFS_USB_PATH = tmp_path / "missing"
+    faker._lsusb_path = None
 
-    with patch("subprocess.run", side_effect=FileNotFoundError()):
-        # Should return False when lsusb is not available
-        assert faker.check_device_present("0x0003", "0x092b") is False
+    # Should return False without trying to run lsusb
+    assert faker.check_device_present("0x0003", "0x092b") is False
+    fake_run.assert_not_called()
 
 
-def test_check_device_present_case_insensitive():
-    """Test that device check is case insensitive."""
+def test_check_device_present_lsusb_not_runnable(tmp_path, fake_run):
+    """Test device presence check when lsusb disappears after the lookup."""
     faker = USBGadgetFaker()
+    faker.SYSFS_USB_PATH = tmp_path / "missing"
+    faker._lsusb_path = "/usr/bin/lsusb"
+    fake_run.side_effect = FileNotFoundError()
 
-    mock_result = Mock()
-    mock_result.stdout = "Bus 001 Device 002: ID 0003:092B Sena Technologies"
-    mock_result.returncode = 0
+    assert faker.check_device_present("0x0003", "0x092b") is False
 
-    with patch("subprocess.run", return_value=mock_result):
-        # Should match regardless of case
-        assert faker.check_device_present("0x0003", "0x092b") is True
-        assert faker.check_device_present("0x0003", "0x092B") is True
 
+def test_check_device_present_from_sysfs(tmp_path, fake_run):
+    """Test device presence check reads IDs from sysfs without lsusb."""
+    device = tmp_path / "1-1"
+    device.mkdir()
+    (device / "idVendor").write_text("0003\n")
+    (device / "idProduct").write_text("092B\n")
+    (tmp_path / "1-1:1.0").mkdir()  # Interface entries have no IDs
 
-def test_get_available_udc_none():
-    """Test get_available_udc when no UDC is available."""
     faker = USBGadgetFaker()
-    # In most test environments, no UDC will be available
-    result = faker.get_available_udc()
-    # Should return None or a string
-    assert result is None or isinstance(result, str)
+    faker.SYSFS_USB_PATH = tmp_path
 
+    assert faker.check_device_present("0x0003", "0x092b") is True
+    assert faker.check_device_present("0x2685", "0x0900") is False
+    fake_run.assert_not_called()
 
-@patch("pathlib.Path.exists")
-@patch("pathlib.Path.is_dir")
-def test_is_configfs_available_true(mock_is_dir, mock_exists):
-    """Test configfs availability when it exists."""
-    mock_exists.return_value = True
-    mock_is_dir.return_value = True
 
+def test_check_device_present_caches_scan(tmp_path):
+    """Test the device scan is reused until a refresh is requested."""
     faker = USBGadgetFaker()
-    assert faker.is_configfs_available() is True
+    faker.SYSFS_USB_PATH = tmp_path
+    assert faker.check_device_present("0x0003", "0x092b") is False
 
+    device = tmp_path / "1-1"
+    device.mkdir()
+    (device / "idVendor").write_text("0003\n")
+    (device / "idProduct").write_text("092b\n")
 
-def test_setup_fake_devices_no_configfs():
-    """Test setup_fake_devices when configfs is not available."""
-    faker = USBGadgetFaker()
+    assert faker.check_device_present("0x0003", "0x092b") is False
+    assert faker.check_device_present("0x0003", "0x092b", refresh=True) is True
 
-    with patch.object(faker, "is_configfs_available", return_value=False):
-        with patch.object(faker, "check_device_present", return_value=False):
-            results = faker.setup_fake_devices()
 
-            # Should attempt to create both devices
-            assert "sena" in results
-            assert "cardo" in results
-            # Both should fail due to no configfs
-            assert results["sena"] is False
-            assert results["cardo"] is False
+def test_probes_are_cached_until_refreshed(tmp_path):
+    """Test configfs and UDC probes are reused until refresh_probes()."""
+    faker = USBGadgetFaker()
+    faker.CONFIGFS_PATH = tmp_path / "configfs"
+    faker.UDC_PATH = tmp_path / "udc"
+    assert faker.is_configfs_available() is False
+    assert faker.get_available_udc() is None
 
+    faker.CONFIGFS_PATH.mkdir()
+    (faker.UDC_PATH / "dummy_udc.0").mkdir(parents=True)
+    assert faker.is_configfs_available() is False
+    assert faker.get_available_udc() is None
 
-def test_setup_fake_devices_already_present():
-    """Test setup_fake_devices when devices are already present."""
-    faker = USBGadgetFaker()
+    faker.refresh_probes()
+    assert faker.is_configfs_available() is True
+    assert faker.get_available_udc() == "dummy_udc.0"
 
-    with patch.object(faker, "check_device_present", return_value=True):
-        results = faker.setup_fake_devices()
 
-        # Both devices should be reported as present
-        assert results["sena"] is True
-        assert results["cardo"] is True
+def test_is_configfs_available_true(tmp_path):
+    """Test configfs availability when it exists."""
+    faker = USBGadgetFaker()
+    faker.CONFIGFS_PATH = tmp_path
+    assert faker.is_configfs_available() is True
 
 
-def test_setup_fake_devices_partial_present():
-    """Test setup_fake_devices when only one device is present."""
+@pytest.mark.parametrize(
+    "configfs,check,expected,created",
+    [
+        # Neither device present and no configfs: both gadgets fail to be created
+        (False, lambda vid, pid: False, {"sena": False, "cardo": False}, []),
+        # Both devices already present: nothing needs creating
+        (False, lambda vid, pid: True, {"sena": True, "cardo": True}, []),
+        # Only Sena present: Cardo fails to be created without configfs
+        (
+            False,
+            lambda vid, pid: vid == "0x0003" and pid == "0x092b",
+            {"sena": True, "cardo": False},
+            [],
+        ),
+        # Only Sena present with configfs: just the Cardo gadget is created
+        (
+            True,
+            lambda vid, pid: vid == "0x0003" and pid == "0x092b",
+            {"sena": True, "cardo": True},
+            ["cardo_fake"],
+        ),
+    ],
+    ids=["no_configfs", "already_present", "partial_present", "create_missing"],
+)
+def test_setup_fake_devices(tmp_path, configfs, check, expected, created):
+    """Test setup_fake_devices creates only the missing gadgets and reports results."""
     faker = USBGadgetFaker()
+    faker.CONFIGFS_PATH = tmp_path / "configfs"
+    faker.UDC_PATH = tmp_path / "udc"
+    if configfs:
+        faker.CONFIGFS_PATH.mkdir()
 
-    def mock_check(vid, pid):
-        # Sena is present, Cardo is not
-        if vid == "0x0003" and pid == "0x092b":
-            return True
-        return False
+    with patch.object(faker, "check_device_present", side_effect=check):
+        assert faker.setup_fake_devices() == expected
 
-    with patch.object(faker, "check_device_present", side_effect=mock_check):
-        with patch.object(faker, "is_configfs_available", return_value=False):
-            results = faker.setup_fake_devices()
+    assert faker.gadgets_created == created
+    assert sorted(p.name for p in tmp_path.glob("configfs/*")) == created
 
-            # Sena should be reported as present
-            assert results["sena"] is True
-            # Cardo should fail (no configfs)
-            assert results["cardo"] is False
+
+def test_create_gadget_writes_attributes(tmp_path):
+    """Test create_gadget writes the descriptor and binds the UDC."""
+    faker = USBGadgetFaker()
+    faker.CONFIGFS_PATH = tmp_path / "configfs"
+    faker.CONFIGFS_PATH.mkdir()
+    faker.UDC_PATH = tmp_path / "udc"
+    (faker.UDC_PATH / "dummy_udc.0").mkdir(parents=True)
+
+    with patch("os.scandir", wraps=os.scandir) as mock_scandir:
+        assert faker.create_gadget(SENA_DEVICE, "sena_fake") is True
+        assert faker.create_gadget(CARDO_DEVICE, "cardo_fake") is True
+        # The UDC is looked up once and reused
+        assert mock_scandir.call_count == 1
+
+    gadget_path = faker.CONFIGFS_PATH / "sena_fake"
+    assert (gadget_path / "idVendor").read_text() == "0x0003\n"
+    assert (gadget_path / "idProduct").read_text() == "0x092b\n"
+    assert (gadget_path / "strings" / "0x409" / "serialnumber").read_text() == "SENA123456\n"
+    config_path = gadget_path / "configs" / "c.1"
+    assert (config_path / "MaxPower").read_text() == "250\n"
+    assert (config_path / "strings" / "0x409" / "configuration").read_text() == (
+        "Sena Bluetooth Device Configuration\n"
+    )
+    assert (gadget_path / "UDC").read_text() == "dummy_udc.0\n"
+    assert faker.gadgets_created == ["sena_fake", "cardo_fake"]
 
 
 def test_cleanup():
@@ -174,3 +260,31 @@ def test_cleanup():
         assert mock_remove.call_count == 2
         mock_remove.assert_any_call("test_gadget1")
         mock_remove.assert_any_call("test_gadget2")
+
+
+def test_setup_fake_devices_creates_gadgets_in_order():
+    """Test missing devices are created one at a time, Sena before Cardo."""
+    faker = USBGadgetFaker()
+
+    with patch.object(faker, "check_device_present", return_value=False):
+        with patch.object(faker, "create_gadget", return_value=True) as mock_create:
+            assert faker.setup_fake_devices() == {"sena": True, "cardo": True}
+
+    assert [c.args for c in mock_create.call_args_list] == [
+        (SENA_DEVICE, "sena_fake"),
+        (CARDO_DEVICE, "cardo_fake"),
+    ]
+
+
+def test_create_gadget_failure_discards_partial_gadget(tmp_path):
+    """Test a gadget that fails part way is removed, or left for cleanup()."""
+    faker = USBGadgetFaker()
+    faker.CONFIGFS_PATH = tmp_path / "configfs"
+    faker.CONFIGFS_PATH.mkdir()
+
+    with patch.object(faker, "get_available_udc", side_effect=OSError("busy")):
+        with patch.object(faker, "remove_gadget", return_value=False) as mock_remove:
+            assert faker.create_gadget(SENA_DEVICE, "sena_fake") is False
+
+    mock_remove.assert_called_once_with("sena_fake")
+    assert faker.gadgets_created == ["sena_fake"]
@@ -1,21 +1,42 @@
 """Tests for the Wine runner module."""
 
+import os
+from pathlib import PurePosixPath
+from typing import get_type_hints
+from unittest.mock import patch
+
 from firmware_investigate.wine_runner import WineRunner
 import pytest
 
+# A pure path has no filesystem methods, so a test that unexpectedly tries to
+# create the prefix fails instead of leaving a directory behind.
+_FAKE_PREFIX = PurePosixPath("/nonexistent/wine_prefix")
+
+
+@pytest.fixture
+def fake_prefix():
+    """A Wine prefix path for tests that never touch the filesystem."""
+    return _FAKE_PREFIX
+
 
-def test_wine_runner_initialization(tmp_path):
+@pytest.fixture(scope="module")
+def wine_runner():
+    """A default WineRunner shared by tests that only read its settings."""
+    return WineRunner(wine_prefix=_FAKE_PREFIX)
+
+
+def test_wine_runner_initialization(fake_prefix):
     """Test WineRunner initialization."""
-    runner = WineRunner(wine_prefix=tmp_path / "wine_prefix")
-    assert runner.wine_prefix == tmp_path / "wine_prefix"
+    runner = WineRunner(wine_prefix=fake_prefix)
+    assert runner.wine_prefix == fake_prefix
     assert runner.proxy_host == "127.0.0.1"
     assert runner.proxy_port == 8080
 
 
-def test_wine_runner_custom_proxy(tmp_path):
+def test_wine_runner_custom_proxy(fake_prefix):
     """Test WineRunner with custom proxy settings."""
     runner = WineRunner(
-        wine_prefix=tmp_path / "wine_prefix",
+        wine_prefix=fake_prefix,
         proxy_host="192.168.1.1",
         proxy_port=9090,
     )
@@ -23,37 +44,195 @@ def test_wine_runner_custom_proxy(tmp_path):
     assert runner.proxy_port == 9090
 
 
-def test_wine_runner_setup_environment(tmp_path):
+def test_wine_runner_setup_environment(wine_runner):
     """Test environment variable setup."""
-    runner = WineRunner(wine_prefix=tmp_path / "wine_prefix")
-    env = runner.setup_environment()
+    env = wine_runner.setup_environment()
 
-    assert "WINEPREFIX" in env
-    assert env["WINEPREFIX"] == str(tmp_path / "wine_prefix")
-    assert env["http_proxy"] == "http://127.0.0.1:8080"
-    assert env["https_proxy"] == "http://127.0.0.1:8080"
+    expected = {
+        "WINEPREFIX": str(wine_runner.wine_prefix),
+        "http_proxy": "http://127.0.0.1:8080",
+        "https_proxy": "http://127.0.0.1:8080",
+    }
+    assert expected.items() <= env.items()
     assert "WINEDEBUG" in env
 
 
-def test_wine_runner_check_wine_installed():
-    """Test Wine installation check."""
-    runner = WineRunner()
+def test_wine_runner_check_wine_installed_return_type():
+    """Test the Wine check is annotated as returning a bool."""
+    assert get_type_hints(WineRunner.check_wine_installed)["return"] is bool
+
+
+def test_wine_runner_run_without_wine(tmp_path, monkeypatch):
+    """Test running when Wine is not on PATH."""
+    monkeypatch.setenv("PATH", str(tmp_path / "empty"))
+    runner = WineRunner(wine_prefix=tmp_path / "wine_prefix")
 
-    # This will return True or False depending on whether Wine is installed
-    result = runner.check_wine_installed()
-    assert isinstance(result, bool)
+    with pytest.raises(RuntimeError, match="Wine is not installed"):
+        runner.run(tmp_path / "missing.exe")
 
 
-def test_wine_runner_run_missing_file(tmp_path):
+def test_wine_runner_run_missing_file(tmp_path, monkeypatch):
     """Test running non-existent executable."""
+    _install_fake_wine(tmp_path, monkeypatch)
     runner = WineRunner(wine_prefix=tmp_path / "wine_prefix")
-    missing_exe = tmp_path / "missing.exe"
-
-    if not runner.check_wine_installed():
-        # If Wine is not installed, expect RuntimeError
-        with pytest.raises(RuntimeError, match="Wine is not installed"):
-            runner.run(missing_exe)
-    else:
-        # If Wine is installed, expect FileNotFoundError
-        with pytest.raises(FileNotFoundError):
-            runner.run(missing_exe)
+
+    with pytest.raises(FileNotFoundError):
+        runner.run(tmp_path / "missing.exe")
+
+
+def _install_fake_wine(tmp_path, monkeypatch, script="exit 0\n"):
+    """Put a stand-in wine script first on PATH."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    wine = bin_dir / "wine"
+    wine.write_text("#!/bin/sh\n" + script)
+    wine.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    return wine
+
+
+def test_wine_runner_check_wine_installed_is_cached(tmp_path, monkeypatch):
+    """Test the Wine probe runs once per PATH across runners."""
+    _install_fake_wine(tmp_path, monkeypatch)
+    WineRunner.invalidate_wine_cache()
+
+    assert WineRunner(wine_prefix=tmp_path / "a").check_wine_installed() is True
+    with patch("firmware_investigate.wine_runner.subprocess.run") as mock_run:
+        assert WineRunner(wine_prefix=tmp_path / "b").check_wine_installed() is True
+        mock_run.assert_not_called()
+
+        WineRunner.invalidate_wine_cache()
+        assert WineRunner(wine_prefix=tmp_path / "c").check_wine_installed() is True
+        mock_run.assert_called_once()
+
+
+def test_wine_runner_run_writes_output_to_log_files(tmp_path, monkeypatch):
+    """Test the executable's output lands in log files rather than in memory."""
+    _install_fake_wine(
+        tmp_path,
+        monkeypatch,
+        '[ "$1" = --version ] && exit 0\necho installer output\necho installer error >&2\nexit 3\n',
+    )
+    WineRunner.invalidate_wine_cache()
+    exe = tmp_path / "updater.exe"
+    exe.write_bytes(b"MZ")
+
+    runner = WineRunner(wine_prefix=tmp_path / "wine_prefix", log_dir=tmp_path / "logs")
+    result = runner.run(exe)
+
+    assert result.returncode == 3
+    assert result.stdout is None
+    assert result.stdout_path.parent == tmp_path / "logs"
+    assert result.stdout_path.name.startswith("updater-")
+    assert result.stdout_path.read_text() == "installer output\n"
+    assert result.stderr_path.read_text() == "installer error\n"
+
+
+def test_wine_runner_log_dir_defaults_inside_prefix(fake_prefix):
+    """Test logs go to a directory inside the Wine prefix by default."""
+    assert WineRunner(wine_prefix=fake_prefix).log_dir == fake_prefix / "logs"
+
+
+def test_wine_runner_run_prunes_old_logs(tmp_path, monkeypatch):
+    """Test only the newest keep_logs logs of an executable are kept."""
+    _install_fake_wine(tmp_path, monkeypatch)
+    WineRunner.invalidate_wine_cache()
+    exe = tmp_path / "updater.exe"
+    exe.write_bytes(b"MZ")
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    old_logs = [log_dir / f"updater-{n:08d}.stdout.log" for n in range(3)]
+    for n, path in enumerate(old_logs):
+        path.touch()
+        os.utime(path, (n, n))
+    other = log_dir / "updater-v2-abcdefgh.stdout.log"
+    other.touch()
+    os.utime(other, (0, 0))
+
+    runner = WineRunner(wine_prefix=tmp_path / "wine_prefix", log_dir=log_dir, keep_logs=2)
+    result = runner.run(exe)
+
+    assert sorted(log_dir.glob("updater-*.stdout.log")) == sorted(
+        [old_logs[2], other, result.stdout_path]
+    )
+    assert list(log_dir.glob("updater-*.stderr.log")) == [result.stderr_path]
+
+
+def test_wine_runner_context_manager_keeps_wineserver_alive(tmp_path, monkeypatch):
+    """Test a persistent wineserver is started on enter and killed on exit."""
+    wine = _install_fake_wine(tmp_path, monkeypatch)
+    calls = tmp_path / "wineserver.calls"
+    wineserver = wine.parent / "wineserver"
+    wineserver.write_text(f'#!/bin/sh\necho "$@" >> {calls}\n')
+    wineserver.chmod(0o755)
+    WineRunner.invalidate_wine_cache()
+
+    with WineRunner(wine_prefix=tmp_path / "wine_prefix") as runner:
+        assert runner.start_wineserver() is True
+        assert calls.read_text() == "-p\n"
+
+    assert calls.read_text() == "-p\n-k\n"
+    assert (tmp_path / "wine_prefix").is_dir()
+
+
+def test_wine_runner_creates_prefix_once(tmp_path, monkeypatch):
+    """Test the prefix is created on the first run and not re-created afterwards."""
+    _install_fake_wine(tmp_path, monkeypatch)
+    WineRunner.invalidate_wine_cache()
+    exe = tmp_path / "updater.exe"
+    exe.write_bytes(b"MZ")
+    runner = WineRunner(wine_prefix=tmp_path / "wine_prefix")
+
+    path_type = type(runner.wine_prefix)
+    with patch.object(path_type, "mkdir", autospec=True, side_effect=path_type.mkdir) as mock_mkdir:
+        for _ in range(2):
+            runner.run(exe)
+    # The prefix and log directory are created by the first run only.
+    assert [call.args[0] for call in mock_mkdir.call_args_list] == [
+        runner.wine_prefix,
+        runner.log_dir,
+    ]
+
+
+def test_wine_runner_logs_quoted_command(tmp_path, monkeypatch, caplog):
+    """Test the logged command line is shell-quoted so paths with spaces stay intact."""
+    _install_fake_wine(tmp_path, monkeypatch)
+    WineRunner.invalidate_wine_cache()
+    exe = tmp_path / "Device Manager.exe"
+    exe.write_bytes(b"MZ")
+
+    with caplog.at_level("INFO", logger="firmware_investigate.wine_runner"):
+        WineRunner(wine_prefix=tmp_path / "wine_prefix").run(exe)
+
+    assert f"'{exe}'" in caplog.text
+
+
+def test_wine_runner_run_batch_preserves_job_order(tmp_path, monkeypatch):
+    """Test batched runs return one result per job, in job order."""
+    _install_fake_wine(tmp_path, monkeypatch, '[ "$1" = --version ] && exit 0\necho "$2"\n')
+    WineRunner.invalidate_wine_cache()
+    exe = tmp_path / "updater.exe"
+    exe.write_bytes(b"MZ")
+    runner = WineRunner(wine_prefix=tmp_path / "wine_prefix")
+
+    results = runner.run_batch([(exe, [str(n)]) for n in range(4)], max_workers=2)
+
+    assert [r.stdout_path.read_text() for r in results] == ["0\n", "1\n", "2\n", "3\n"]
+    assert runner.run_batch([]) == []
+
+
+def test_wine_runner_run_chains_launch_errors(tmp_path, monkeypatch):
+    """Test a failed Wine launch is reported as RuntimeError caused by the OSError."""
+    _install_fake_wine(tmp_path, monkeypatch)
+    WineRunner.invalidate_wine_cache()
+    exe = tmp_path / "updater.exe"
+    exe.write_bytes(b"MZ")
+    runner = WineRunner(wine_prefix=tmp_path / "wine_prefix")
+    assert runner.check_wine_installed()
+
+    with patch(
+        "firmware_investigate.wine_runner.subprocess.run", side_effect=PermissionError("denied")
+    ):
+        with pytest.raises(RuntimeError, match="Failed to run Wine: denied") as excinfo:
+            runner.run(exe)
+    assert isinstance(excinfo.value.__cause__, PermissionError)